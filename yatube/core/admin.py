@@ -0,0 +1,16 @@
+from django.contrib import admin
+
+from .models import QueuedEmail
+
+
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        'subject', 'recipients', 'created', 'next_attempt', 'attempts',
+        'failed'
+    )
+    list_filter = ('failed',)
+    exclude = ('payload',)
+    readonly_fields = ('last_error',)
+
+
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
@@ -0,0 +1,42 @@
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import (
+    DjangoTemplates, Template, reraise
+)
+
+from . import metrics
+
+
+class TimedTemplate(Template):
+    """Шаблон, время рендеринга которого попадает в метрики запроса."""
+
+    def render(self, context=None, request=None):
+        request_metrics = metrics.current.get()
+        if request_metrics is None:
+            return super().render(context, request)
+        request_metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            request_metrics.template_depth -= 1
+            if not request_metrics.template_depth:
+                request_metrics.template_time += (
+                    time.perf_counter() - started
+                )
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates с учётом времени рендеринга в core.metrics."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
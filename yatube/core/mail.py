@@ -0,0 +1,174 @@
+"""Очередь исходящей почты.
+
+QueuedEmailBackend не отправляет письма, а кладёт их в таблицу
+QueuedEmail — одна вставка вместо работы с диском или SMTP внутри
+запроса. Команда send_queued_mail забирает письма пачками, отправляет
+через EMAIL_QUEUE_BACKEND и при ошибке откладывает новую попытку
+с растущей паузой.
+
+Письмо хранится в JSON, а не в pickle: разбор payload из базы не
+исполняет код, а письмо, которое не удаётся прочитать, сразу
+помечается неотправляемым и не останавливает воркер.
+"""
+import base64
+import json
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+MAX_ATTEMPTS = 5
+# сколько письмо числится за воркером, прежде чем его возьмёт другой
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой: 1, 2, 4, 8... минут."""
+    return timedelta(minutes=2 ** (attempts - 1))
+
+
+def dump_content(content):
+    if isinstance(content, bytes):
+        return {'base64': base64.b64encode(content).decode('ascii')}
+    return content
+
+
+def load_content(content):
+    if isinstance(content, dict):
+        return base64.b64decode(content['base64'])
+    return content
+
+
+def dump_message(message):
+    """EmailMessage в строку JSON для поля payload."""
+    attachments = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            # готовая MIME-часть: сохраняем её имя, данные и тип
+            attachment = (
+                attachment.get_filename(),
+                attachment.get_payload(decode=True),
+                attachment.get_content_type(),
+            )
+        filename, content, mimetype = attachment
+        attachments.append([filename, dump_content(content), mimetype])
+    return json.dumps({
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': attachments,
+        'content_subtype': message.content_subtype,
+        'mixed_subtype': message.mixed_subtype,
+        'encoding': message.encoding,
+    }, ensure_ascii=False)
+
+
+def load_message(payload):
+    """Письмо из payload; при испорченных данных — ValueError и др."""
+    data = json.loads(payload)
+    message = EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+        attachments=[
+            (filename, load_content(content), mimetype)
+            for filename, content, mimetype in data['attachments']
+        ],
+    )
+    message.content_subtype = data['content_subtype']
+    message.mixed_subtype = data['mixed_subtype']
+    message.encoding = data['encoding']
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        now = timezone.now()
+        queued = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            queued.append(QueuedEmail(
+                subject=message.subject[:255],
+                recipients=', '.join(message.recipients()),
+                payload=dump_message(message),
+                next_attempt=now,
+            ))
+        QueuedEmail.objects.bulk_create(queued)
+        return len(queued)
+
+
+def claim_batch(batch_size):
+    """Забирает пачку писем, которые пора отправить.
+
+    Письма помечаются меткой воркера одним UPDATE и откладываются на
+    CLAIM_TIMEOUT: второй воркер их не возьмёт, а если первый упадёт,
+    письма вернутся в очередь по истечении этого срока.
+    """
+    now = timezone.now()
+    due = QueuedEmail.objects.filter(failed=False, next_attempt__lte=now)
+    ids = list(due.values_list('pk', flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid4().hex
+    due.filter(pk__in=ids).update(
+        claim=token, next_attempt=now + CLAIM_TIMEOUT
+    )
+    return list(QueuedEmail.objects.filter(claim=token))
+
+
+def send_batch(batch_size=100, max_attempts=MAX_ATTEMPTS):
+    """Отправляет одну пачку; возвращает (отправлено, с ошибкой)."""
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+    sent = failed = 0
+    connection = get_connection(settings.EMAIL_QUEUE_BACKEND)
+    with connection:
+        for queued in batch:
+            try:
+                message = load_message(queued.payload)
+            except Exception as error:
+                # испорченное письмо не прочитается и потом: повторять
+                # бессмысленно, оно сразу помечается неотправляемым
+                failed += 1
+                postpone(queued, error, max_attempts=0)
+                continue
+            message.connection = connection
+            try:
+                message.send()
+            except Exception as error:
+                failed += 1
+                postpone(queued, error, max_attempts)
+            else:
+                sent += 1
+                queued.delete()
+    return sent, failed
+
+
+def postpone(queued, error, max_attempts):
+    queued.attempts += 1
+    queued.last_error = f'{type(error).__name__}: {error}'
+    queued.failed = queued.attempts >= max_attempts
+    queued.next_attempt = timezone.now() + retry_delay(queued.attempts)
+    queued.claim = ''
+    queued.save(update_fields=(
+        'attempts', 'last_error', 'failed', 'next_attempt', 'claim'
+    ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from core.sessions import PURGE_CHUNK_SIZE, purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии небольшими пачками, не блокируя '
+        'таблицу сессий надолго.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=PURGE_CHUNK_SIZE)
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Пауза между пачками, секунды.',
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(
+            options['chunk_size'],
+            options['pause'],
+            on_chunk=lambda done: self.stdout.write(f'Удалено: {done}'),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Истёкших сессий удалено: {deleted}.')
+        )
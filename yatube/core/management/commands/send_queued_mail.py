@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import MAX_ATTEMPTS, send_batch
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди пачками, с повтором при ошибках.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не выходить, а ждать новые письма.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза между проверками очереди в режиме --loop, секунды.',
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_batch(
+                options['batch_size'], options['max_attempts']
+            )
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f'Отправлено: {sent}, с ошибкой: {failed}')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово. Отправлено: {total_sent}, с ошибкой: {total_failed}.'
+        ))
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.slow_queries import read_entries, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала медленных запросов по отпечаткам SQL: сколько '
+        'раз, сколько времени в сумме и из каких представлений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.SLOW_QUERY_LOG)
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Показать план самого медленного случая.',
+        )
+
+    def handle(self, *args, **options):
+        groups = summarize(read_entries(options['log']))
+        if not groups:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        for group in groups[:options['limit']]:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{group["fingerprint"]}: {group["count"]} раз, '
+                f'всего {group["total_ms"]:.0f} мс, '
+                f'среднее {group["total_ms"] / group["count"]:.1f} мс, '
+                f'максимум {group["max_ms"]:.1f} мс'
+            ))
+            self.stdout.write(f'  {group["sql"]}')
+            if group['views']:
+                self.stdout.write(
+                    f'  представления: {", ".join(sorted(group["views"]))}'
+                )
+            if options['plans'] and group['plan']:
+                for line in group['plan']:
+                    self.stdout.write(f'    {line}')
+        self.stdout.write(f'Всего отпечатков: {len(groups)}')
@@ -0,0 +1,163 @@
+"""Метрики запросов в текстовом формате Prometheus.
+
+Значения копятся в памяти процесса: при нескольких процессах
+сервера каждый отдаёт свои, а суммирует их Prometheus. Учёт на
+один запрос — несколько обращений к словарям под общей блокировкой
+и perf_counter на каждый SQL-запрос, поэтому его можно не выключать.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# границы корзин гистограмм: секунды и байты
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+
+METRICS = {
+    'yatube_request_duration_seconds': (
+        'histogram', 'Время обработки запроса.', DURATION_BUCKETS
+    ),
+    'yatube_db_queries': (
+        'histogram', 'SQL-запросов на один запрос.', QUERY_COUNT_BUCKETS
+    ),
+    'yatube_db_duration_seconds': (
+        'histogram', 'Время SQL-запросов за один запрос.', DURATION_BUCKETS
+    ),
+    'yatube_template_duration_seconds': (
+        'histogram', 'Время рендеринга шаблонов за один запрос.',
+        DURATION_BUCKETS
+    ),
+    'yatube_response_size_bytes': (
+        'histogram', 'Размер тела ответа.', SIZE_BUCKETS
+    ),
+    'yatube_responses_total': (
+        'counter', 'Ответы по представлениям и кодам.', None
+    ),
+    'yatube_fragment_cache_total': (
+        'counter', 'Попадания и промахи кэша карточек постов.', None
+    ),
+}
+
+_lock = threading.Lock()
+# (имя, метки) -> [счётчики корзин..., сумма] или число
+_values = {}
+
+current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Замеры одного запроса, которые копят хуки БД и шаблонов."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        # вложенные рендеры (карточки внутри ленты) уже учтены внешним
+        self.template_depth = 0
+
+    @property
+    def duration(self):
+        return time.perf_counter() - self.started
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: считает все запросы на соединении
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+
+def observe(name, value, labels):
+    """Добавляет наблюдение в гистограмму name."""
+    buckets = METRICS[name][2]
+    key = (name, labels)
+    with _lock:
+        series = _values.get(key)
+        if series is None:
+            series = _values[key] = [0] * (len(buckets) + 1) + [0.0]
+        series[bisect_left(buckets, value)] += 1
+        series[-1] += value
+
+
+def increment(name, labels, amount=1):
+    key = (name, labels)
+    with _lock:
+        _values[key] = _values.get(key, 0) + amount
+
+
+def get_value(name, labels):
+    """Текущее значение счётчика name с метками labels."""
+    with _lock:
+        return _values.get((name, labels), 0)
+
+
+def record(request_metrics, view, method, status, size):
+    """Сохраняет замеры завершённого запроса."""
+    labels = (('view', view), ('method', method))
+    observe('yatube_request_duration_seconds', request_metrics.duration,
+            labels)
+    observe('yatube_db_queries', request_metrics.queries, labels)
+    observe('yatube_db_duration_seconds', request_metrics.db_time, labels)
+    observe('yatube_template_duration_seconds',
+            request_metrics.template_time, labels)
+    if size is not None:
+        observe('yatube_response_size_bytes', size, labels)
+    increment('yatube_responses_total', labels + (('status', str(status)),))
+
+
+def reset():
+    with _lock:
+        _values.clear()
+
+
+def format_labels(labels):
+    escaped = (
+        (name, value.replace('\\', r'\\').replace('"', r'\"'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def format_number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def render():
+    """Все метрики в текстовом формате экспозиции Prometheus."""
+    with _lock:
+        values = sorted(
+            (key, list(value) if isinstance(value, list) else value)
+            for key, value in _values.items()
+        )
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for (series_name, labels), value in values:
+            if series_name != name:
+                continue
+            if kind == 'counter':
+                lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            bounds = [format_number(bound) for bound in buckets] + ['+Inf']
+            for bound, count in zip(bounds, value):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{format_labels(labels + (("le", bound),))}'
+                    f' {cumulative}'
+                )
+            lines.append(
+                f'{name}_sum{format_labels(labels)} {format_number(value[-1])}'
+            )
+            lines.append(f'{name}_count{format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,156 @@
+import copy
+import hashlib
+import re
+
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import QueryDict
+from django.urls import resolve
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import parse_http_date_safe, quote_etag
+
+from . import metrics
+from .slow_queries import SlowQueryRecorder
+
+INCLUDE_RE = re.compile(rb'<!--# include virtual="([^"]+)" -->')
+
+
+class EdgeIncludeMiddleware:
+    """Заменяет edge include на ответ указанного адреса.
+
+    Локальная замена обратного прокси с SSI: страница до подстановки
+    одинакова для всех и может лежать в общем кэше, а после
+    подстановки становится личной. При EDGE_INCLUDES = False метки
+    остаются в ответе, и их обрабатывает настоящий прокси.
+
+    ETag страницы описывает её без шапки, поэтому в собранном ответе
+    он заменяется отпечатком ETag страницы вместе с подставленными
+    фрагментами: после входа или выхода отпечаток меняется, а пока
+    не меняется ни страница, ни шапка, браузер получает 304.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (not settings.EDGE_INCLUDES
+                or response.streaming
+                or not response.get('Content-Type', '').startswith(
+                    'text/html')
+                or b'<!--# include' not in response.content):
+            return response
+        included = []
+
+        def include(match):
+            content = self.include(request, match.group(1).decode())
+            included.append(content)
+            return content
+
+        response.content = INCLUDE_RE.sub(include, response.content)
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(response.content))
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ('Cookie',))
+        if not response.has_header('ETag'):
+            return response
+        digest = hashlib.md5(response['ETag'].encode())
+        for content in included:
+            digest.update(content)
+        response['ETag'] = quote_etag(digest.hexdigest())
+        if (request.method not in ('GET', 'HEAD')
+                or response.status_code != 200):
+            return response
+        return get_conditional_response(
+            request,
+            etag=response['ETag'],
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')
+            ),
+            response=response,
+        )
+
+    def include(self, request, uri):
+        path, _, query = uri.partition('?')
+        match = resolve(path)
+        subrequest = copy.copy(request)
+        subrequest.method = 'GET'
+        subrequest.path = subrequest.path_info = path
+        subrequest.GET = QueryDict(query)
+        subrequest.resolver_match = match
+        response = match.func(subrequest, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response.content
+
+
+class MetricsMiddleware:
+    """Собирает время, SQL-запросы, рендеринг шаблонов и размер ответа.
+
+    Стоит первым в MIDDLEWARE, чтобы учитывать работу остальных
+    middleware, в том числе подстановку edge include. При
+    METRICS_SERVER_TIMING замеры запроса уходят и в заголовок
+    Server-Timing, где их показывают инструменты разработчика.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current.set(request_metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(request_metrics)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        size = None if response.streaming else len(response.content)
+        metrics.record(
+            request_metrics, view, request.method, response.status_code, size
+        )
+        if settings.METRICS_SERVER_TIMING:
+            response['Server-Timing'] = self.server_timing(request_metrics)
+        return response
+
+    @staticmethod
+    def server_timing(request_metrics):
+        return ', '.join((
+            f'db;dur={request_metrics.db_time * 1000:.1f};'
+            f'desc="SQL: {request_metrics.queries}"',
+            f'tpl;dur={request_metrics.template_time * 1000:.1f}',
+            f'total;dur={request_metrics.duration * 1000:.1f}',
+        ))
+
+
+class SlowQueryMiddleware:
+    """Пишет в журнал SQL-запросы дольше SLOW_QUERY_MS.
+
+    При SLOW_QUERY_MS = None не подключается вовсе.
+    """
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_MS is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = SlowQueryRecorder(
+            request, settings.SLOW_QUERY_MS, settings.SLOW_QUERY_PARAMS
+        )
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
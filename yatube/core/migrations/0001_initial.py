@@ -0,0 +1,34 @@
+# Generated by Django 2.2.6 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueuedEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255, verbose_name='Тема')),
+                ('recipients', models.TextField(verbose_name='Получатели')),
+                ('payload', models.BinaryField()),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Поставлено в очередь')),
+                ('next_attempt', models.DateTimeField(db_index=True, verbose_name='Следующая попытка')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Попыток')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('failed', models.BooleanField(default=False, verbose_name='Попытки исчерпаны')),
+                ('claim', models.CharField(blank=True, max_length=32)),
+            ],
+            options={
+                'verbose_name': 'письмо в очереди',
+                'verbose_name_plural': 'очередь писем',
+                'ordering': ['next_attempt'],
+            },
+        ),
+    ]
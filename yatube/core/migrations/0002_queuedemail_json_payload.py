@@ -0,0 +1,133 @@
+# Generated by Django 2.2.6 on 2026-10-18 21:40
+
+import base64
+import json
+import pickle
+
+from django.core.mail import EmailMultiAlternatives
+from django.db import migrations, models
+
+
+# Замороженная копия core.mail.dump_message на момент миграции:
+# код приложения может меняться, а миграции должны работать как были.
+def dump_content(content):
+    if isinstance(content, bytes):
+        return {'base64': base64.b64encode(content).decode('ascii')}
+    return content
+
+
+def dump_message(message):
+    attachments = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            attachment = (
+                attachment.get_filename(),
+                attachment.get_payload(decode=True),
+                attachment.get_content_type(),
+            )
+        filename, content, mimetype = attachment
+        attachments.append([filename, dump_content(content), mimetype])
+    return json.dumps({
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': attachments,
+        'content_subtype': message.content_subtype,
+        'mixed_subtype': message.mixed_subtype,
+        'encoding': message.encoding,
+    }, ensure_ascii=False)
+
+
+def load_message(payload):
+    data = json.loads(payload)
+    message = EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+        attachments=[
+            (filename,
+             base64.b64decode(content['base64'])
+             if isinstance(content, dict) else content,
+             mimetype)
+            for filename, content, mimetype in data['attachments']
+        ],
+    )
+    message.content_subtype = data['content_subtype']
+    message.mixed_subtype = data['mixed_subtype']
+    message.encoding = data['encoding']
+    return message
+
+
+def pickle_to_json(apps, schema_editor):
+    """Переводит письма в очереди из pickle в JSON.
+
+    Письма в очередь клал только QueuedEmailBackend; то, что всё же
+    не читается, помечается неотправляемым, а не останавливает
+    миграцию.
+    """
+    QueuedEmail = apps.get_model('core', 'QueuedEmail')
+    for queued in QueuedEmail.objects.iterator():
+        try:
+            queued.payload = dump_message(pickle.loads(queued.pickled))
+        except Exception as error:
+            queued.failed = True
+            queued.last_error = f'{type(error).__name__}: {error}'
+        queued.save(update_fields=('payload', 'failed', 'last_error'))
+
+
+def json_to_pickle(apps, schema_editor):
+    QueuedEmail = apps.get_model('core', 'QueuedEmail')
+    for queued in QueuedEmail.objects.iterator():
+        try:
+            queued.pickled = pickle.dumps(load_message(queued.payload))
+        except Exception as error:
+            queued.pickled = b''
+            queued.failed = True
+            queued.last_error = f'{type(error).__name__}: {error}'
+        queued.save(update_fields=('pickled', 'failed', 'last_error'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    # старое поле переименовано и временно допускает NULL, чтобы
+    # миграцию можно было откатить: обратная RemoveField добавит его
+    # пустым, а json_to_pickle заполнит
+    operations = [
+        migrations.RenameField(
+            model_name='queuedemail',
+            old_name='payload',
+            new_name='pickled',
+        ),
+        migrations.AlterField(
+            model_name='queuedemail',
+            name='pickled',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name='queuedemail',
+            name='payload',
+            field=models.TextField(default=''),
+            preserve_default=False,
+        ),
+        migrations.RunPython(pickle_to_json, json_to_pickle),
+        migrations.RemoveField(
+            model_name='queuedemail',
+            name='pickled',
+        ),
+    ]
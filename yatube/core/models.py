@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class QueuedEmail(models.Model):
+    """Письмо, ожидающее отправки командой send_queued_mail."""
+    subject = models.CharField('Тема', max_length=255)
+    recipients = models.TextField('Получатели')
+    # EmailMessage целиком в JSON, см. core.mail.dump_message
+    payload = models.TextField()
+    created = models.DateTimeField('Поставлено в очередь', auto_now_add=True)
+    next_attempt = models.DateTimeField('Следующая попытка', db_index=True)
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    failed = models.BooleanField('Попытки исчерпаны', default=False)
+    # метка воркера, забравшего письмо в работу
+    claim = models.CharField(max_length=32, blank=True)
+
+    class Meta:
+        ordering = ['next_attempt']
+        verbose_name = 'письмо в очереди'
+        verbose_name_plural = 'очередь писем'
+
+    def __str__(self):
+        return f'{self.subject} → {self.recipients}'
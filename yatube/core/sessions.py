@@ -0,0 +1,47 @@
+"""Сессии в базе с удалением истёкших небольшими пачками.
+
+Кэша перед базой нет: у процессов с LocMemCache он свой, и выход или
+удаление сессии сбрасывали бы запись только в одном из них. Слой кэша
+(бэкенд cached_db) имеет смысл вернуть только поверх общего кэша —
+memcached или redis.
+"""
+import time
+
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.contrib.sessions.models import Session
+from django.db import transaction
+from django.utils import timezone
+
+PURGE_CHUNK_SIZE = 1000
+
+
+def purge_expired(chunk_size=PURGE_CHUNK_SIZE, pause=0, on_chunk=None):
+    """Удаляет истёкшие сессии пачками, каждую в своей транзакции.
+
+    Одна большая DELETE держала бы блокировку таблицы сессий всё
+    время удаления; короткие транзакции дают пройти входам
+    пользователей между пачками. Возвращает число удалённых сессий.
+    """
+    deleted = 0
+    now = timezone.now()
+    while True:
+        with transaction.atomic():
+            keys = list(
+                Session.objects.filter(expire_date__lt=now).values_list(
+                    'session_key', flat=True
+                )[:chunk_size]
+            )
+            if not keys:
+                return deleted
+            Session.objects.filter(session_key__in=keys).delete()
+        deleted += len(keys)
+        if on_chunk:
+            on_chunk(deleted)
+        if pause:
+            time.sleep(pause)
+
+
+class SessionStore(DBStore):
+    @classmethod
+    def clear_expired(cls):
+        purge_expired()
@@ -0,0 +1,177 @@
+"""Журнал медленных SQL-запросов.
+
+Запрос дольше SLOW_QUERY_MS записывается в журнал yatube.slow_queries
+одной JSON-строкой: SQL, типы параметров, время, представление, из
+которого он пришёл, и план выполнения (EXPLAIN QUERY PLAN в SQLite).
+Сами значения параметров пишутся только для SELECT и только при
+SLOW_QUERY_PARAMS: в INSERT и UPDATE уходят хэши паролей, данные
+сессий и тексты постов. Команда
+slow_queries сводит журнал по отпечаткам — SQL без литералов
+и с одинаково записанными списками IN.
+"""
+import glob
+import hashlib
+import json
+import logging
+import re
+import time
+
+from django.utils import timezone
+
+logger = logging.getLogger('yatube.slow_queries')
+
+# параметры длиннее этого обрезаются: в журнал не должны уходить тексты
+PARAM_LIMIT = 200
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.I)
+SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """SQL без комментариев и литералов, с одним пробелом."""
+    sql = COMMENT_RE.sub('', sql)
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize(sql).encode()).hexdigest()[:12]
+
+
+def view_path(request):
+    """posts.views.index и т. п. для запроса, если адрес уже разобран."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return f'{match.func.__module__}.{match.func.__qualname__}'
+
+
+def is_select(sql):
+    return sql.lstrip()[:6].upper() == 'SELECT'
+
+
+def param_types(params):
+    if params is None:
+        return None
+    return [type(value).__name__ for value in params]
+
+
+def short_params(params):
+    if params is None:
+        return None
+    return [
+        value if isinstance(value, (int, float, type(None)))
+        else str(value)[:PARAM_LIMIT]
+        for value in params
+    ]
+
+
+def explain(connection, sql, params):
+    """План запроса или None, если его не получить."""
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            ]
+    except Exception:
+        # План — подсказка, а не часть ответа: ошибка здесь
+        # не должна ломать запрос пользователя.
+        return None
+
+
+class SlowQueryRecorder:
+    """execute_wrapper, записывающий запросы дольше порога."""
+
+    def __init__(self, request, threshold_ms, log_params=False):
+        self.request = request
+        self.threshold = threshold_ms / 1000
+        self.log_params = log_params
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        elapsed = time.perf_counter() - started
+        if elapsed >= self.threshold and not many and not self.explaining:
+            self.record(context['connection'], sql, params, elapsed)
+        return result
+
+    def record(self, connection, sql, params, elapsed):
+        plan = None
+        select = is_select(sql)
+        if select:
+            self.explaining = True
+            try:
+                plan = explain(connection, sql, params)
+            finally:
+                self.explaining = False
+        logger.warning(json.dumps({
+            'time': timezone.now().isoformat(),
+            'duration_ms': round(elapsed * 1000, 2),
+            'fingerprint': fingerprint(sql),
+            'view': view_path(self.request),
+            'path': self.request.path,
+            'sql': sql,
+            'param_types': param_types(params),
+            'params': (
+                short_params(params) if select and self.log_params else None
+            ),
+            'plan': plan,
+        }, ensure_ascii=False, default=str))
+
+
+def read_entries(path):
+    """Записи журнала вместе с ротированными файлами, от старых к новым."""
+    rotated = sorted(
+        glob.glob(f'{path}.[0-9]*'),
+        key=lambda name: int(name.rsplit('.', 1)[1]),
+        reverse=True
+    )
+    for name in rotated + [path]:
+        try:
+            with open(name, encoding='utf-8') as log:
+                for line in log:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            continue
+
+
+def summarize(entries):
+    """Группы по отпечатку SQL, самые дорогие в сумме — первыми."""
+    groups = {}
+    for entry in entries:
+        group = groups.get(entry['fingerprint'])
+        if group is None:
+            group = groups[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'],
+                'sql': normalize(entry['sql']),
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'views': set(),
+                'plan': None,
+            }
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        if entry['duration_ms'] >= group['max_ms']:
+            # план самого медленного случая нагляднее всего
+            group['max_ms'] = entry['duration_ms']
+            group['plan'] = entry.get('plan')
+        if entry.get('view'):
+            group['views'].add(entry['view'])
+    return sorted(
+        groups.values(), key=lambda group: group['total_ms'], reverse=True
+    )
@@ -0,0 +1,16 @@
+from django import template
+
+from posts.fragments import render_articles
+
+register = template.Library()
+
+
+@register.simple_tag
+def article_cards(posts, without_group_links=False):
+    """Готовые карточки всей страницы для вывода в цикле.
+
+    {% article_cards page_obj as cards %} и цикл по cards заменяют
+    include карточки в цикле по постам: кэш читается и пишется один
+    раз на страницу.
+    """
+    return render_articles(posts, without_group_links=without_group_links)
@@ -0,0 +1,42 @@
+from django import template
+
+from posts.paginators import PAGE_WINDOW
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj, window=PAGE_WINDOW):
+    """Номера страниц вокруг текущей; None обозначает пропуск.
+
+    Первая страница показывается всегда, последняя — только если
+    число страниц известно точно.
+    """
+    paginator = page_obj.paginator
+    last = paginator.num_pages
+    estimated = getattr(paginator, 'is_estimated', False)
+    current = page_obj.number
+    numbers = {1, *range(max(1, current - window),
+                         min(last, current + window) + 1)}
+    if not estimated:
+        numbers.add(last)
+    window_pages = []
+    previous = 0
+    for number in sorted(numbers):
+        if number - previous > 1:
+            window_pages.append(None)
+        window_pages.append(number)
+        previous = number
+    if estimated and previous < last:
+        window_pages.append(None)
+    return window_pages
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, **params):
+    """Ссылка на страницу с сохранением остальных GET-параметров."""
+    query = context['request'].GET.copy()
+    for name in ('page', 'cursor'):
+        query.pop(name, None)
+    query.update(params)
+    return f'?{query.urlencode()}'
@@ -0,0 +1,356 @@
+import io
+import json
+import os
+import re
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post
+
+from . import metrics
+from .mail import claim_batch
+from .models import QueuedEmail
+from .sessions import SessionStore, purge_expired
+from .slow_queries import fingerprint, normalize, read_entries, summarize
+
+User = get_user_model()
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='metrics')
+        Post.objects.create(author=cls.user, text='Пост для метрик')
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.guest_client = Client()
+
+    def sample(self, text, name, **labels):
+        pattern = re.escape(name) + r'\{([^}]*)\} (\S+)'
+        for found in re.finditer(pattern, text):
+            pairs = dict(re.findall(r'(\w+)="([^"]*)"', found.group(1)))
+            if all(pairs.get(key) == value for key, value in labels.items()):
+                return float(found.group(2))
+        return None
+
+    def get_metrics(self):
+        return self.guest_client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+
+    def test_request_is_recorded(self):
+        """Запрос к ленте попадает в гистограммы и счётчик ответов."""
+        self.guest_client.get(reverse('posts:index'))
+        response = self.get_metrics()
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        text = response.content.decode()
+        self.assertIn('# TYPE yatube_request_duration_seconds histogram',
+                      text)
+        labels = {'view': 'posts:index', 'method': 'GET'}
+        self.assertEqual(self.sample(
+            text, 'yatube_responses_total', status='200', **labels
+        ), 1)
+        self.assertEqual(self.sample(
+            text, 'yatube_request_duration_seconds_count', **labels
+        ), 1)
+        self.assertGreater(self.sample(
+            text, 'yatube_db_queries_sum', **labels
+        ), 0)
+        self.assertGreater(self.sample(
+            text, 'yatube_template_duration_seconds_sum', **labels
+        ), 0)
+        self.assertGreater(self.sample(
+            text, 'yatube_response_size_bytes_sum', **labels
+        ), 0)
+
+    def test_unresolved_and_not_found(self):
+        """Несуществующие адреса учитываются без имени представления."""
+        self.guest_client.get('/nothing-here/')
+        text = self.get_metrics().content.decode()
+        self.assertEqual(self.sample(
+            text, 'yatube_responses_total', view='<unresolved>', status='404'
+        ), 1)
+
+    def test_access(self):
+        """Метрики видят только персонал и запросы с токеном."""
+        url = reverse('metrics')
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
+        self.assertEqual(self.guest_client.get(
+            url, REMOTE_ADDR='127.0.0.1'
+        ).status_code, 404)
+        self.assertEqual(self.guest_client.get(
+            url, HTTP_AUTHORIZATION='Bearer wrong'
+        ).status_code, 404)
+        self.assertEqual(self.guest_client.get(
+            url, HTTP_AUTHORIZATION='Bearer secret'
+        ).status_code, 200)
+        with self.settings(METRICS_TOKEN=None):
+            self.assertEqual(self.guest_client.get(
+                url, HTTP_AUTHORIZATION='Bearer None'
+            ).status_code, 404)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.guest_client.force_login(staff)
+        self.assertEqual(self.guest_client.get(url).status_code, 200)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        response = self.get_metrics()
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_SERVER_TIMING=True)
+    def test_server_timing(self):
+        """Замеры запроса отдаются в заголовке Server-Timing."""
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="SQL: \d+", tpl;dur=[\d.]+, '
+            r'total;dur=[\d.]+$'
+        )
+
+    @override_settings(METRICS_SERVER_TIMING=False)
+    def test_server_timing_off(self):
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class SlowQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_fingerprint_ignores_literals_and_in_lists(self):
+        """Запросы, отличающиеся только значениями, — один отпечаток."""
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 10'),
+            fingerprint('SELECT  * FROM t WHERE id IN (%s) LIMIT 20'),
+        )
+        self.assertEqual(
+            normalize("/* explain */ SELECT 'a''b', 1.5 FROM t"),
+            'SELECT ?, ? FROM t'
+        )
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_query_is_logged_with_view_and_plan(self):
+        """В журнал попадают SQL, представление и план запроса."""
+        with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+            self.guest_client.get(reverse('posts:index'))
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        selects = [
+            entry for entry in entries if entry['sql'].startswith('SELECT')
+        ]
+        self.assertTrue(selects)
+        self.assertEqual(selects[0]['view'], 'posts.views.index')
+        self.assertEqual(selects[0]['path'], reverse('posts:index'))
+        self.assertTrue(selects[0]['plan'])
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_params_are_not_logged_by_default(self):
+        """Значения параметров не попадают в журнал, только их типы."""
+        user = User.objects.create_user(username='author')
+        self.guest_client.force_login(user)
+        with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+            self.guest_client.post(
+                reverse('posts:post_create'), {'text': 'Секретный текст'}
+            )
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        self.assertTrue(any(
+            entry['sql'].startswith('INSERT') and entry['param_types']
+            for entry in entries
+        ))
+        self.assertTrue(all(entry['params'] is None for entry in entries))
+        self.assertNotIn('Секретный', ''.join(
+            record.getMessage() for record in logs.records
+        ))
+
+    @override_settings(SLOW_QUERY_MS=0, SLOW_QUERY_PARAMS=True)
+    def test_params_are_logged_only_for_select(self):
+        user = User.objects.create_user(username='author')
+        self.guest_client.force_login(user)
+        with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+            self.guest_client.post(
+                reverse('posts:post_create'), {'text': 'Секретный текст'}
+            )
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        for entry in entries:
+            if entry['sql'].startswith('SELECT'):
+                continue
+            self.assertIsNone(entry['params'])
+        self.assertTrue(any(
+            entry['params'] for entry in entries
+            if entry['sql'].startswith('SELECT')
+        ))
+
+    def test_report_groups_by_fingerprint(self):
+        """Команда сводит записи всех файлов журнала по отпечаткам."""
+        def entry(sql, duration):
+            return json.dumps({
+                'sql': sql, 'fingerprint': fingerprint(sql),
+                'duration_ms': duration, 'view': 'posts.views.index',
+                'plan': [f'SCAN {duration}'],
+            }) + '\n'
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'slow.log')
+            with open(path + '.1', 'w') as rotated:
+                rotated.write(entry('SELECT 1 FROM t WHERE id = 5', 300))
+            with open(path, 'w') as log:
+                log.write(entry('SELECT 1 FROM t WHERE id = 7', 500))
+                log.write(entry('SELECT 2 FROM u', 100))
+                log.write('не JSON\n')
+            groups = summarize(read_entries(path))
+            output = io.StringIO()
+            call_command('slow_queries', log=path, plans=True, stdout=output)
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(groups[0]['count'], 2)
+        self.assertEqual(groups[0]['total_ms'], 800)
+        self.assertEqual(groups[0]['plan'], ['SCAN 500'])
+        self.assertIn('2 раз, всего 800 мс', output.getvalue())
+        self.assertIn('posts.views.index', output.getvalue())
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_revoked_session_is_rejected(self):
+        """Сессия, удалённая из базы, не пускает ни в одном процессе."""
+        User.objects.create_user(username='session', password='Pass-1234')
+        client = Client()
+        client.login(username='session', password='Pass-1234')
+        self.assertContains(
+            client.get(reverse('users:header')), 'Пользователь: session'
+        )
+        Session.objects.filter(
+            session_key=client.session.session_key
+        ).delete()
+        self.assertContains(client.get(reverse('users:header')), 'Войти')
+
+    def test_purge_expired_in_chunks(self):
+        """Истёкшие сессии удаляются пачками, живые остаются."""
+        past = timezone.now() - timedelta(days=1)
+        future = timezone.now() + timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f'old{i}', session_data='', expire_date=past)
+            for i in range(5)
+        )
+        Session.objects.create(
+            session_key='alive', session_data='', expire_date=future
+        )
+        chunks = []
+        self.assertEqual(purge_expired(chunk_size=2, on_chunk=chunks.append),
+                         5)
+        self.assertEqual(chunks, [2, 4, 5])
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['alive']
+        )
+
+    def test_clearsessions_uses_chunked_purge(self):
+        Session.objects.create(
+            session_key='old', session_data='',
+            expire_date=timezone.now() - timedelta(days=1)
+        )
+        SessionStore.clear_expired()
+        self.assertFalse(Session.objects.exists())
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_QUEUE_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class MailQueueTests(TestCase):
+    def send_queued(self, **options):
+        call_command('send_queued_mail', stdout=io.StringIO(), **options)
+
+    def test_password_reset_is_queued(self):
+        """Сброс пароля ставит письмо в очередь, отправляет его воркер."""
+        User.objects.create_user(
+            username='reset', email='reset@example.com', password='Pass-1234'
+        )
+        response = Client().post(
+            reverse('users:password_reset_form'),
+            {'email': 'reset@example.com'}
+        )
+        self.assertRedirects(response, reverse('users:password_reset_done'))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+        self.send_queued()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['reset@example.com'])
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    @override_settings(EMAIL_QUEUE_BACKEND='core.tests.FailingBackend')
+    def test_failed_send_is_retried_later(self):
+        """Ошибка откладывает письмо, после max_attempts оно бросается."""
+        mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        self.send_queued(max_attempts=2)
+        queued = QueuedEmail.objects.get()
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn('SMTP недоступен', queued.last_error)
+        self.assertGreater(queued.next_attempt, timezone.now())
+        self.assertFalse(queued.failed)
+        QueuedEmail.objects.update(next_attempt=timezone.now())
+        self.send_queued(max_attempts=2)
+        self.assertTrue(QueuedEmail.objects.get().failed)
+
+    def test_payload_is_json(self):
+        """Письмо с HTML-версией и вложением переживает очередь."""
+        message = mail.EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'],
+            cc=['cc@example.com'], headers={'X-Tag': 'reset'}
+        )
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('data.bin', b'\x00\xff', 'application/octet-stream')
+        message.send()
+        self.assertEqual(
+            json.loads(QueuedEmail.objects.get().payload)['to'],
+            ['to@example.com']
+        )
+        self.send_queued()
+        sent = mail.outbox[0]
+        self.assertEqual(sent.recipients(),
+                         ['to@example.com', 'cc@example.com'])
+        self.assertEqual(sent.extra_headers, {'X-Tag': 'reset'})
+        self.assertEqual(sent.alternatives, [('<p>Текст</p>', 'text/html')])
+        self.assertEqual(sent.attachments,
+                         [('data.bin', b'\x00\xff',
+                           'application/octet-stream')])
+
+    def test_broken_payload_does_not_stop_the_queue(self):
+        """Нечитаемое письмо сразу помечается failed, остальные уходят."""
+        mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        broken = QueuedEmail.objects.create(
+            subject='Сломано', recipients='to@example.com',
+            payload='{not json', next_attempt=timezone.now()
+        )
+        self.send_queued()
+        self.assertEqual(len(mail.outbox), 1)
+        broken.refresh_from_db()
+        self.assertTrue(broken.failed)
+        self.assertIn('JSONDecodeError', broken.last_error)
+        self.assertEqual(list(QueuedEmail.objects.all()), [broken])
+
+    def test_claimed_messages_are_not_taken_twice(self):
+        """Письма, взятые одним воркером, не достаются другому."""
+        mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@example.com'])
+        self.assertEqual(len(claim_batch(10)), 1)
+        self.assertEqual(claim_batch(10), [])
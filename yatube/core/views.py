@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from . import metrics
+
+
+def metrics_allowed(request):
+    """Разрешён ли запрос к метрикам.
+
+    Пускаем персонал и запросы с заголовком Authorization: Bearer
+    <METRICS_TOKEN>. Адрес не проверяется: за прокси у всех запросов
+    REMOTE_ADDR 127.0.0.1.
+    """
+    if request.user.is_staff:
+        return True
+    token = settings.METRICS_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and constant_time_compare(header, f'Bearer {token}')
+
+
+def metrics_view(request):
+    """Метрики процесса для Prometheus.
+
+    Чужим и при выключенных метриках отвечает 404, чтобы не выдавать
+    сам адрес.
+    """
+    if not settings.METRICS_ENABLED or not metrics_allowed(request):
+        raise Http404
+    return HttpResponse(
+        metrics.render(), content_type='text/plain; version=0.0.4'
+    )
@@ -1,5 +1,6 @@
 from django.contrib import admin
 
+from . import fts
 from .models import Post, Group
 
 
@@ -10,6 +11,12 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск идёт по полнотекстовому индексу, а не через LIKE.
+        if not search_term:
+            return queryset, False
+        return fts.filter_matching(queryset, search_term), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
@@ -0,0 +1,217 @@
+"""JSON API лент только для чтения.
+
+Строки выбираются через values(), без создания объектов моделей,
+а состав полей задаёт параметр fields=. Ленты листаются курсором
+по (pub_date, id), как и HTML-ленты в режиме курсора.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from . import export
+from .models import AuthorStats, Group, Post, User
+from .paginators import CursorPaginator
+
+API_PAGE_SIZE = 10
+API_MAX_PAGE_SIZE = 100
+# имя поля в ответе -> путь для values()
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'updated': 'updated',
+    'author': 'author__username',
+    'author_first_name': 'author__first_name',
+    'author_last_name': 'author__last_name',
+    'group': 'group__slug',
+    'group_title': 'group__title',
+}
+# без этих колонок не построить курсор
+CURSOR_PATHS = ('id', 'pub_date')
+
+
+class ApiError(Exception):
+    pass
+
+
+def api_response(data, status=200):
+    return JsonResponse(
+        data,
+        status=status,
+        encoder=DjangoJSONEncoder,
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def api_view(view):
+    """GET-представление, отвечающее на ошибки JSON, а не HTML.
+
+    ApiError становится ответом 400, Http404 — ответом 404.
+    """
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return api_response({'error': str(error)}, status=400)
+        except Http404:
+            return api_response({'detail': 'Не найдено'}, status=404)
+    return wrapper
+
+
+def get_fields(request):
+    """Пары (имя, путь) для fields=; без параметра — все поля."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(POST_FIELDS.items())
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in POST_FIELDS]
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}')
+    return [(name, POST_FIELDS[name]) for name in names]
+
+
+def get_page_size(request):
+    try:
+        size = int(request.GET.get('limit', API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError('limit должен быть числом')
+    return max(1, min(size, API_MAX_PAGE_SIZE))
+
+
+def serialize(rows, fields):
+    return [{name: row[path] for name, path in fields} for row in rows]
+
+
+def feed_response(request, posts):
+    fields = get_fields(request)
+    paths = {path for _, path in fields} | set(CURSOR_PATHS)
+    paginator = CursorPaginator(posts.values(*paths), get_page_size(request))
+    page = paginator.get_page(request.GET.get('cursor'))
+    return api_response({
+        'results': serialize(page, fields),
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+@api_view
+def post_list(request):
+    return feed_response(request, Post.objects.for_feed())
+
+
+@api_view
+def post_detail(request, post_id):
+    fields = get_fields(request)
+    row = get_object_or_404(
+        Post.objects.values(*{path for _, path in fields}), pk=post_id
+    )
+    return api_response(serialize([row], fields)[0])
+
+
+@api_view
+def group_detail(request, slug):
+    group = get_object_or_404(
+        Group.objects.values('slug', 'title', 'description', 'posts_count'),
+        slug=slug
+    )
+    return api_response(group)
+
+
+@api_view
+def group_posts(request, slug):
+    get_object_or_404(Group.objects.values('pk'), slug=slug)
+    return feed_response(
+        request, Post.objects.for_feed().filter(group__slug=slug)
+    )
+
+
+@api_view
+def author_detail(request, username):
+    author = get_object_or_404(
+        User.objects.values('pk', 'username', 'first_name', 'last_name'),
+        username=username
+    )
+    author['posts_count'] = AuthorStats.objects.filter(
+        author_id=author.pop('pk')
+    ).values_list('posts_count', flat=True).first() or 0
+    return api_response(author)
+
+
+@api_view
+def author_posts(request, username):
+    get_object_or_404(User.objects.values('pk'), username=username)
+    return feed_response(
+        request, Post.objects.for_feed().filter(author__username=username)
+    )
+
+
+def export_allowed(request):
+    """Выгрузку получают персонал и запросы с токеном EXPORT_TOKEN."""
+    if request.user.is_staff:
+        return True
+    token = settings.EXPORT_TOKEN
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and constant_time_compare(header, f'Bearer {token}')
+
+
+def export_rate_exceeded(request):
+    """Считает выгрузки клиента за окно EXPORT_RATE_PERIOD.
+
+    Счётчик живёт в кэше по умолчанию; с LocMemCache он свой у
+    каждого процесса, и общий предел умножается на их число.
+    """
+    client = (
+        f'user:{request.user.pk}' if request.user.is_authenticated
+        else f'ip:{request.META.get("REMOTE_ADDR")}'
+    )
+    key = f'api:export:rate:{client}'
+    cache.add(key, 0, settings.EXPORT_RATE_PERIOD)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Счётчик истёк между add и incr: начинаем окно заново.
+        cache.set(key, 1, settings.EXPORT_RATE_PERIOD)
+        count = 1
+    return count > settings.EXPORT_RATE_LIMIT
+
+
+@api_view
+def export_posts(request):
+    """Потоковая выгрузка постов с фильтрами author, group, since, until.
+
+    Доступна только персоналу и по токену и ограничена по частоте:
+    поток всей таблицы постов не должен быть открыт каждому.
+    """
+    if not export_allowed(request):
+        raise Http404
+    if export_rate_exceeded(request):
+        return api_response(
+            {'detail': 'Слишком много выгрузок, попробуйте позже'},
+            status=429,
+        )
+    export_format = request.GET.get('format', 'jsonl')
+    try:
+        posts = export.filter_posts(
+            author=request.GET.get('author'),
+            group=request.GET.get('group'),
+            since=request.GET.get('since'),
+            until=request.GET.get('until'),
+        )
+        lines = export.export_lines(posts, export_format)
+    except ValueError as error:
+        raise ApiError(str(error))
+    response = StreamingHttpResponse(
+        lines, content_type=export.EXPORT_FORMATS[export_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{export_format}"'
+    )
+    return response
@@ -0,0 +1,126 @@
+"""Замеры представлений тестовым клиентом и проверка бюджетов.
+
+Результат замера — словарь с p50_ms, p95_ms, queries и bytes.
+Бюджет задаёт для представления верхние границы этих же величин;
+базовый прогон — результаты прошлого замера, с которыми сравнивается
+новый.
+"""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment,
+    teardown_test_environment
+)
+
+# метрики, у которых рост — это ухудшение
+BUDGET_METRICS = ('p50_ms', 'p95_ms', 'queries', 'bytes')
+# свой кэш замеров: cache.clear() между запросами не должен сбрасывать
+# общий кэш сайта (memcached, redis), если он настроен
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmarks',
+    },
+}
+
+
+def private_cache():
+    """Подменяет кэш по умолчанию отдельным LocMemCache замеров."""
+    return override_settings(CACHES=BENCHMARK_CACHES)
+
+
+@contextmanager
+def benchmark_environment():
+    """Окружение тестового клиента, если оно ещё не настроено.
+
+    Кэш по умолчанию на время замера подменяется private_cache().
+    """
+    with private_cache():
+        try:
+            setup_test_environment()
+        except RuntimeError:
+            # Уже внутри тестов: окружение настроено не нами.
+            yield
+            return
+        try:
+            yield
+        finally:
+            teardown_test_environment()
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = round(percent / 100 * (len(ordered) - 1))
+    return ordered[index]
+
+
+def measure(client, url, repeat, method='get', data=None, warm=False):
+    """Выполняет запрос repeat раз и сводит время, запросы и размер.
+
+    Без warm кэш сбрасывается перед каждым запросом, и замер
+    показывает стоимость страницы, собранной с нуля.
+    """
+    timings = []
+    queries = 0
+    size = 0
+    status = None
+    send = getattr(client, method)
+    for _ in range(repeat):
+        if not warm:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send(url, data or {})
+            timings.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, len(captured))
+        size = len(response.content)
+        status = response.status_code
+    return {
+        'status': status,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'queries': queries,
+        'bytes': size,
+    }
+
+
+def check_budgets(results, budgets):
+    """Нарушения бюджетов: строки вида «размер view метрика: …»."""
+    violations = []
+    for size, views in results.items():
+        for view, metrics in views.items():
+            for metric, limit in budgets.get(view, {}).items():
+                if metrics[metric] > limit:
+                    violations.append(
+                        f'{size} {view} {metric}: {metrics[metric]} '
+                        f'> бюджета {limit}'
+                    )
+    return violations
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Ухудшения относительно прошлого прогона больше чем на tolerance.
+
+    Число запросов сравнивается точно: лишний запрос — всегда
+    регрессия, а не шум замера.
+    """
+    violations = []
+    for size, views in results.items():
+        for view, metrics in views.items():
+            previous = baseline.get(size, {}).get(view)
+            if not previous:
+                continue
+            for metric in BUDGET_METRICS:
+                allowed = previous[metric]
+                if metric != 'queries':
+                    allowed *= 1 + tolerance
+                if metrics[metric] > allowed:
+                    violations.append(
+                        f'{size} {view} {metric}: {metrics[metric]} '
+                        f'против {previous[metric]} в базовом прогоне'
+                    )
+    return violations
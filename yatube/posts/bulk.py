@@ -0,0 +1,62 @@
+import random
+from datetime import timedelta
+
+from django.utils import timezone
+
+from . import page_cache
+from .counters import rebuild_counters, recount
+from .models import Group, Post, User
+
+BATCH_SIZE = 5000
+
+
+def seed_sample(posts, authors, groups, seed=1, prefix='sample'):
+    """Быстро заполняет базу однотипными данными для замеров.
+
+    Возвращает созданных авторов и группы.
+    """
+    rnd = random.Random(seed)
+    User.objects.bulk_create(
+        User(username=f'{prefix}-{i}') for i in range(authors)
+    )
+    Group.objects.bulk_create(
+        Group(title=f'Группа {i}', slug=f'{prefix}-{i}', description='')
+        for i in range(groups)
+    )
+    users = list(User.objects.filter(username__startswith=f'{prefix}-'))
+    group_list = list(Group.objects.filter(slug__startswith=f'{prefix}-'))
+    now = timezone.now()
+    for start in range(0, posts, BATCH_SIZE):
+        Post.objects.bulk_create(
+            (
+                Post(
+                    text='Текст',
+                    author=rnd.choice(users),
+                    group=rnd.choice(group_list + [None]),
+                    pub_date=now - timedelta(minutes=rnd.randrange(10**6)),
+                )
+                for _ in range(start, min(start + BATCH_SIZE, posts))
+            ),
+            keep_pub_date=True,
+        )
+    return users, group_list
+
+
+def sync_after_bulk(author_ids=None, group_ids=None):
+    """Приводит счётчики и кэш страниц в соответствие с таблицей.
+
+    bulk_create не посылает сигналов, поэтому то, что для одного
+    поста делают обработчики сигналов, здесь делается один раз.
+    Строки ленты Post.objects.bulk_create добавляет сам. Если
+    затронутые авторы и группы известны, пересчитываются только их
+    счётчики, иначе — все.
+    """
+    if author_ids is None and group_ids is None:
+        rebuild_counters()
+    else:
+        recount(author_ids or (), group_ids or ())
+    page_cache.expire(
+        'feed',
+        *(f'author:{pk}' for pk in author_ids or ()),
+        *(f'group:{pk}' for pk in group_ids or ()),
+    )
@@ -0,0 +1,79 @@
+"""Валидаторы условных GET-запросов (ETag / Last-Modified) для лент.
+
+Last-Modified — самое позднее изменение постов страницы, это один
+запрос MAX(updated) по индексу. Его результат кэшируется под метками
+областей из page_cache, так что повторная проверка обходится без
+базы. ETag дополнительно учитывает сами метки: они меняются и при
+удалении постов, и при переименовании авторов и групп, чего по датам
+не увидеть.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.views.decorators.http import condition
+
+from . import page_cache
+from .models import Post
+
+
+def index_posts():
+    return Post.objects.all()
+
+
+def group_posts(slug):
+    return Post.objects.filter(group__slug=slug)
+
+
+def profile_posts(username):
+    return Post.objects.filter(author__username=username)
+
+
+def post_detail_posts(post_id):
+    # На странице поста виден и счётчик постов автора.
+    return Post.objects.filter(author__posts=post_id)
+
+
+def latest_change(posts, versions):
+    """MAX(updated) по постам; без смены меток берётся из кэша."""
+    key = None
+    if versions:
+        key = 'page:modified:' + hashlib.md5(
+            '|'.join(versions).encode()
+        ).hexdigest()
+        cached = cache.get(key)
+        if cached is not None:
+            return cached[0]
+    latest = posts.order_by().aggregate(latest=Max('updated'))['latest']
+    if key:
+        cache.set(key, (latest,), settings.PAGE_CACHE_TIMEOUT)
+    return latest
+
+
+def conditional_feed(get_posts, get_scopes):
+    """Отвечает 304, если страница не менялась, не рендеря её."""
+    def validators(request, kwargs):
+        if not hasattr(request, '_posts_validators'):
+            scopes = get_scopes(**kwargs)
+            versions = page_cache.get_versions(scopes) if scopes else []
+            request._posts_validators = (
+                versions, latest_change(get_posts(**kwargs), versions)
+            )
+        return request._posts_validators
+
+    def last_modified(request, **kwargs):
+        return validators(request, kwargs)[1]
+
+    def etag(request, **kwargs):
+        versions, modified = validators(request, kwargs)
+        if not versions:
+            return None
+        raw = '|'.join([
+            str(modified and modified.timestamp()),
+            *versions,
+            *(request.GET.get(name, '') for name in page_cache.PAGE_PARAMS),
+        ])
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
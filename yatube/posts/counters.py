@@ -0,0 +1,165 @@
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import AuthorStats, Follow, Group, Post
+
+# сколько авторов или групп пересчитывать одним запросом
+RECOUNT_CHUNK_SIZE = 500
+
+
+def change_author_stats(author_id, field, delta):
+    """Сдвигает счётчик field в AuthorStats автора на delta.
+
+    Уменьшение никогда не заводит строку: при удалении автора каскад
+    сначала удаляет его AuthorStats, а потом посты и подписки, и
+    заводить строку заново нельзя. Расхождение счётчика с таблицами
+    не прячется, его показывает post_counters --check.
+    """
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    updated = stats.update(**{field: F(field) + delta})
+    if not updated and delta > 0:
+        # Строки ещё нет — заводим её с точными значениями.
+        AuthorStats.objects.get_or_create(
+            author_id=author_id,
+            defaults={
+                'posts_count': Post.objects.filter(
+                    author_id=author_id
+                ).count(),
+                'followers_count': Follow.objects.filter(
+                    author_id=author_id
+                ).count(),
+            }
+        )
+
+
+def change_author_posts_count(author_id, delta):
+    """Сдвигает счётчик постов автора на delta."""
+    change_author_stats(author_id, 'posts_count', delta)
+
+
+def change_author_followers_count(author_id, delta):
+    """Сдвигает счётчик подписчиков автора на delta."""
+    change_author_stats(author_id, 'followers_count', delta)
+
+
+def change_group_posts_count(group_id, delta):
+    """Сдвигает счётчик постов группы на delta."""
+    Group.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') + delta
+    )
+
+
+def get_author_posts_count(author):
+    """Количество постов автора из сохранённого счётчика."""
+    try:
+        return author.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def count_posts():
+    """Точные значения счётчиков, посчитанные по таблице постов."""
+    authors = dict(
+        Post.objects.order_by().values_list('author').annotate(Count('pk'))
+    )
+    groups = dict(
+        Post.objects.filter(group__isnull=False).order_by().values_list(
+            'group'
+        ).annotate(Count('pk'))
+    )
+    return authors, groups
+
+
+def count_followers():
+    """Точное число подписчиков авторов, у которых они есть."""
+    return dict(
+        Follow.objects.order_by().values_list('author').annotate(Count('pk'))
+    )
+
+
+def rebuild_counters():
+    """Пересчитывает счётчики постов и подписчиков."""
+    authors, groups = count_posts()
+    followers = count_followers()
+    with transaction.atomic():
+        AuthorStats.objects.all().delete()
+        AuthorStats.objects.bulk_create(
+            AuthorStats(
+                author_id=author_id,
+                posts_count=authors.get(author_id, 0),
+                followers_count=followers.get(author_id, 0),
+            )
+            for author_id in authors.keys() | followers.keys()
+        )
+        Group.objects.exclude(pk__in=groups).update(posts_count=0)
+        for group_id, total in groups.items():
+            Group.objects.filter(pk=group_id).update(posts_count=total)
+
+
+def recount(author_ids=(), group_ids=(), chunk_size=RECOUNT_CHUNK_SIZE):
+    """Пересчитывает счётчики только указанных авторов и групп.
+
+    Нужен массовым путям: пересобирать AuthorStats целиком после
+    каждой загрузки дорого. Id идут пачками, чтобы не упереться
+    в предел параметров запроса.
+    """
+    author_ids = sorted(set(author_ids))
+    group_ids = sorted(set(group_ids))
+    with transaction.atomic():
+        for start in range(0, len(author_ids), chunk_size):
+            chunk = author_ids[start:start + chunk_size]
+            posts = dict(
+                Post.objects.filter(author_id__in=chunk).order_by(
+                ).values_list('author').annotate(Count('pk'))
+            )
+            followers = dict(
+                Follow.objects.filter(author_id__in=chunk).order_by(
+                ).values_list('author').annotate(Count('pk'))
+            )
+            AuthorStats.objects.filter(author_id__in=chunk).delete()
+            AuthorStats.objects.bulk_create(
+                AuthorStats(
+                    author_id=author_id,
+                    posts_count=posts.get(author_id, 0),
+                    followers_count=followers.get(author_id, 0),
+                )
+                for author_id in posts.keys() | followers.keys()
+            )
+        for start in range(0, len(group_ids), chunk_size):
+            chunk = group_ids[start:start + chunk_size]
+            posts = dict(
+                Post.objects.filter(group_id__in=chunk).order_by(
+                ).values_list('group').annotate(Count('pk'))
+            )
+            for group_id in chunk:
+                Group.objects.filter(pk=group_id).update(
+                    posts_count=posts.get(group_id, 0)
+                )
+
+
+def find_counter_mismatches():
+    """Список расхождений: (модель, pk, сохранено, на самом деле)."""
+    authors, groups = count_posts()
+    followers = count_followers()
+    mismatches = []
+    stored_stats = {
+        author_id: (posts, followers)
+        for author_id, posts, followers in AuthorStats.objects.values_list(
+            'author_id', 'posts_count', 'followers_count'
+        )
+    }
+    for author_id in stored_stats.keys() | authors.keys() | followers.keys():
+        stored_posts, stored_followers = stored_stats.get(author_id, (0, 0))
+        actual = authors.get(author_id, 0)
+        if stored_posts != actual:
+            mismatches.append(('author', author_id, stored_posts, actual))
+        actual = followers.get(author_id, 0)
+        if stored_followers != actual:
+            mismatches.append(
+                ('followers', author_id, stored_followers, actual)
+            )
+    for group_id, stored in Group.objects.values_list('pk', 'posts_count'):
+        actual = groups.get(group_id, 0)
+        if stored != actual:
+            mismatches.append(('group', group_id, stored, actual))
+    return mismatches
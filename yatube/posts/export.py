@@ -0,0 +1,108 @@
+"""Потоковая выгрузка постов в JSONL и CSV.
+
+Посты читаются пачками по первичному ключу: каждая пачка — отдельный
+короткий запрос с WHERE id > последний, поэтому память и время
+запроса не зависят от объёма выгрузки, а курсор базы не держится
+открытым всё время выгрузки.
+"""
+import csv
+import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Post
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+# имя колонки -> путь для values_list()
+EXPORT_FIELDS = (
+    ('id', 'id'),
+    ('pub_date', 'pub_date'),
+    ('updated', 'updated'),
+    ('author', 'author__username'),
+    ('group', 'group__slug'),
+    ('text', 'text'),
+)
+
+
+def parse_moment(value):
+    """Дата или дата со временем из строки; дата — это начало суток."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Не удалось разобрать дату: {value}')
+        moment = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def filter_posts(author=None, group=None, since=None, until=None):
+    """Посты для выгрузки; since включительно, until — нет."""
+    posts = Post.objects.all()
+    if author:
+        posts = posts.filter(author__username=author)
+    if group:
+        posts = posts.filter(group__slug=group)
+    if since:
+        posts = posts.filter(pub_date__gte=parse_moment(since))
+    if until:
+        posts = posts.filter(pub_date__lt=parse_moment(until))
+    return posts
+
+
+def iter_rows(posts, chunk_size=EXPORT_CHUNK_SIZE):
+    """Кортежи EXPORT_FIELDS пачками по chunk_size в порядке id."""
+    paths = [path for _, path in EXPORT_FIELDS]
+    rows = posts.order_by('pk').values_list(*paths)
+    last_pk = None
+    while True:
+        chunk = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+        chunk = list(chunk[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1][0]
+
+
+class Echo:
+    """Файлоподобный объект для csv.writer: отдаёт строку обратно."""
+
+    def write(self, value):
+        return value
+
+
+def jsonl_lines(rows):
+    names = [name for name, _ in EXPORT_FIELDS]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + '\n'
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in EXPORT_FIELDS])
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if isinstance(value, datetime.datetime)
+            else value
+            for value in row
+        )
+
+
+def export_lines(posts, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки выгрузки в нужном формате, по одной на пост."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f'Формат должен быть одним из: {", ".join(EXPORT_FORMATS)}'
+        )
+    rows = iter_rows(posts, chunk_size)
+    if export_format == 'csv':
+        return csv_lines(rows)
+    return jsonl_lines(rows)
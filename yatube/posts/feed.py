@@ -0,0 +1,136 @@
+"""Денормализованная главная лента: таблица FeedEntry.
+
+Строка ленты повторяет поля карточки поста: дату, имя и ник автора,
+название и адрес группы и начало текста. Обработчики сигналов
+обновляют строку при сохранении и удалении поста и все строки автора
+или группы при их переименовании. bulk_create сигналов не посылает,
+поэтому Post.objects.bulk_create сам вызывает add_missing для
+вставленных постов, а rebuild и find_mismatches нужны команде
+feed_entries.
+"""
+from django.db import transaction
+
+from .models import FeedEntry, Post
+
+# сколько строк ленты вставлять или сверять за раз
+CHUNK_SIZE = 2000
+# поля строки, которые берутся из поста и связанных с ним объектов
+ENTRY_FIELDS = (
+    'pub_date', 'author_id', 'author_username', 'author_name',
+    'group_id', 'group_slug', 'group_title', 'excerpt', 'word_count',
+)
+
+
+def entry_for(post):
+    """Строка ленты для поста с загруженными автором и группой."""
+    group = post.group
+    return FeedEntry(
+        pk=post.pk,
+        pub_date=post.pub_date,
+        author_id=post.author_id,
+        author_username=post.author.username,
+        author_name=post.author.get_full_name(),
+        group_id=post.group_id,
+        group_slug=group.slug if group else '',
+        group_title=group.title if group else '',
+        excerpt=post.excerpt,
+        word_count=post.word_count,
+    )
+
+
+def save_post(post, created):
+    """Записывает строку ленты для нового или изменённого поста."""
+    entry_for(post).save(force_insert=created)
+
+
+def delete_post(post):
+    FeedEntry.objects.filter(pk=post.pk).delete()
+
+
+def rename_author(user):
+    """Переносит новое имя автора в его строки ленты.
+
+    Строки, где имя уже совпадает, не переписываются: сохранение
+    пользователя без смены имени ничего не пишет в ленту.
+    """
+    name = user.get_full_name()
+    FeedEntry.objects.filter(author=user).exclude(
+        author_username=user.username, author_name=name
+    ).update(author_username=user.username, author_name=name)
+
+
+def rename_group(group):
+    FeedEntry.objects.filter(group=group).exclude(
+        group_slug=group.slug, group_title=group.title
+    ).update(group_slug=group.slug, group_title=group.title)
+
+
+def forget_group(group):
+    """Убирает удаляемую группу из строк ленты."""
+    FeedEntry.objects.filter(group=group).update(
+        group=None, group_slug='', group_title=''
+    )
+
+
+def iter_posts(posts):
+    """Посты с автором и группой пачками по возрастанию id."""
+    posts = posts.select_related('author', 'group').defer('text').order_by(
+        'pk'
+    )
+    last = 0
+    while True:
+        chunk = list(posts.filter(pk__gt=last)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1].pk
+
+
+def add_missing(posts=None):
+    """Добавляет строки для постов, у которых их нет; возвращает число.
+
+    posts сужает проверку, например до только что вставленных постов.
+    """
+    if posts is None:
+        posts = Post.objects.all()
+    added = 0
+    missing = posts.exclude(pk__in=FeedEntry.objects.values('pk'))
+    for chunk in iter_posts(missing):
+        FeedEntry.objects.bulk_create(
+            [entry_for(post) for post in chunk], ignore_conflicts=True
+        )
+        added += len(chunk)
+    return added
+
+
+def rebuild():
+    """Строит ленту заново по таблице постов; возвращает число строк."""
+    with transaction.atomic():
+        FeedEntry.objects.all().delete()
+        return add_missing()
+
+
+def entry_values(entry):
+    return tuple(getattr(entry, field) for field in ENTRY_FIELDS)
+
+
+def find_mismatches():
+    """Расхождения ленты с постами: (вид, id поста).
+
+    missing — у поста нет строки, stale — поля строки устарели,
+    orphan — строка без поста.
+    """
+    mismatches = []
+    for chunk in iter_posts(Post.objects.all()):
+        stored = FeedEntry.objects.in_bulk([post.pk for post in chunk])
+        for post in chunk:
+            entry = stored.get(post.pk)
+            if entry is None:
+                mismatches.append(('missing', post.pk))
+            elif entry_values(entry) != entry_values(entry_for(post)):
+                mismatches.append(('stale', post.pk))
+    orphans = FeedEntry.objects.exclude(
+        pk__in=Post.objects.values('pk')
+    ).values_list('pk', flat=True)
+    mismatches.extend(('orphan', pk) for pk in orphans)
+    return mismatches
@@ -0,0 +1,177 @@
+"""Кэш отрендеренных карточек постов (posts/includes/article.html).
+
+Ключ карточки складывается из id поста и меток версий поста, автора
+и группы. Метки меняются при сохранении соответствующих объектов,
+так что устаревшая карточка просто перестаёт находиться в кэше.
+Смену метки видят только процессы с общим кэшем; с LocMemCache
+остальные отдают старую карточку до конца FRAGMENT_CACHE_TIMEOUT,
+поэтому в settings он короткий.
+
+render_articles готовит карточки целой страницы: метки и карточки
+читаются из кэша двумя запросами на страницу, а недостающие карточки
+отрисовывает ArticleRenderer по article.html с заранее собранными
+адресами и датой, отформатированной один раз на день.
+"""
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.defaultfilters import date as format_date
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+from django.utils.timezone import template_localtime
+from django.utils.translation import get_language
+
+from core import metrics
+
+ARTICLE_TEMPLATE = 'posts/includes/article.html'
+ARTICLE_DATE_FORMAT = 'd E Y'
+# заглушки, вместо которых в адрес подставляются id поста и slug группы
+URL_PK = 990099
+URL_SLUG = 'slug-990099'
+
+# счётчик в реестре метрик, который отдаёт /metrics
+FRAGMENT_METRIC = 'yatube_fragment_cache_total'
+RESULT_LABELS = {
+    'hits': (('result', 'hit'),),
+    'misses': (('result', 'miss'),),
+}
+
+
+def get_stats():
+    """Попадания и промахи кэша карточек в текущем процессе."""
+    return {
+        name: metrics.get_value(FRAGMENT_METRIC, labels)
+        for name, labels in RESULT_LABELS.items()
+    }
+
+
+def _count(name, amount=1):
+    if amount:
+        metrics.increment(FRAGMENT_METRIC, RESULT_LABELS[name], amount)
+
+
+def version_key(kind, pk):
+    return f'article:version:{kind}:{pk}'
+
+
+def bump_version(kind, pk):
+    """Делает недействительными все карточки, зависящие от объекта."""
+    cache.set(version_key(kind, pk), uuid4().hex[:8], None)
+
+
+def get_versions(keys):
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Метка потеряна или ещё не заводилась: новая метка
+            # гарантирует, что старые карточки не всплывут.
+            cache.add(key, uuid4().hex[:8], None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def article_version_keys(post):
+    return [
+        version_key('post', post.pk),
+        version_key('author', post.author_id),
+        version_key('group', post.group_id),
+    ]
+
+
+def article_key(post, last, without_group_links, versions=None):
+    """Ключ карточки; versions — уже прочитанные метки по их ключам."""
+    keys = article_version_keys(post)
+    if versions is None:
+        versions = get_versions(keys)
+    else:
+        versions = [versions[key] for key in keys]
+    return ':'.join([
+        'article', post._meta.model_name, str(post.pk), *versions,
+        get_language() or '', str(int(last)), str(int(without_group_links)),
+    ])
+
+
+def url_template(name, placeholder):
+    """Части адреса до и после аргумента, вычисленные один раз."""
+    url = reverse(name, args=[placeholder])
+    prefix, _, suffix = url.partition(str(placeholder))
+    return prefix, suffix
+
+
+class ArticleRenderer:
+    """Карточки постов по article.html.
+
+    Шаблон загружается один раз на страницу, а адреса поста и группы
+    собираются из заранее вычисленных частей, без {% url %} на каждую
+    карточку. Дата форматируется один раз на день: посты страницы
+    обычно приходятся на несколько дней.
+    """
+
+    def __init__(self):
+        self.template = get_template(ARTICLE_TEMPLATE)
+        self.detail_url = url_template('posts:post_detail', URL_PK)
+        self.group_url = url_template('posts:group_list', URL_SLUG)
+        self.dates = {}
+
+    def pub_date(self, value):
+        day = template_localtime(value).date()
+        if day not in self.dates:
+            self.dates[day] = format_date(value, ARTICLE_DATE_FORMAT)
+        return self.dates[day]
+
+    def render(self, post, last=False, without_group_links=False):
+        group_url = ''
+        if post.group:
+            group_url = (
+                f'{self.group_url[0]}{post.group.slug}{self.group_url[1]}'
+            )
+        return self.template.render({
+            'post': post,
+            'detail_url': f'{self.detail_url[0]}{post.pk}{self.detail_url[1]}',
+            'group_url': group_url,
+            'pub_date': self.pub_date(post.pub_date),
+            'last': last,
+            'without_group_links': without_group_links,
+        })
+
+
+def render_articles(posts, without_group_links=False):
+    """Список готовых карточек для страницы постов.
+
+    Метки версий всех постов читаются одним get_many, карточки —
+    другим; недостающие строятся одним ArticleRenderer и
+    записываются в кэш одним set_many.
+    """
+    posts = list(posts)
+    if not posts:
+        return []
+    version_keys = list(dict.fromkeys(
+        key for post in posts for key in article_version_keys(post)
+    ))
+    versions = dict(zip(version_keys, get_versions(version_keys)))
+    keys = [
+        article_key(
+            post, number == len(posts), without_group_links, versions
+        )
+        for number, post in enumerate(posts, 1)
+    ]
+    found = cache.get_many(keys)
+    renderer = None
+    fresh = {}
+    parts = []
+    for number, (post, key) in enumerate(zip(posts, keys), 1):
+        html = found.get(key)
+        if html is None:
+            if renderer is None:
+                renderer = ArticleRenderer()
+            html = fresh[key] = renderer.render(
+                post, number == len(posts), without_group_links
+            )
+        parts.append(mark_safe(html))
+    _count('hits', len(posts) - len(fresh))
+    _count('misses', len(fresh))
+    if fresh:
+        cache.set_many(fresh, settings.FRAGMENT_CACHE_TIMEOUT)
+    return parts
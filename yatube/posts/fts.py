@@ -0,0 +1,86 @@
+"""Полнотекстовый индекс постов на SQLite FTS5.
+
+Индекс хранит только ссылки на строки posts_post (external content)
+и синхронизируется триггерами, поэтому его видят и формы, и админка,
+и массовые вставки в обход save(). Таблицу индекса и триггеры создаёт
+миграция 0007; SQLite теряет триггеры, когда пересоздаёт posts_post
+при изменении её полей, поэтому такие миграции создают их снова.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'posts_post_fts'
+MATCH_SQL = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+
+
+def is_available(db):
+    return db.vendor == 'sqlite'
+
+
+def search(queryset, query):
+    """Посты из queryset, подходящие под запрос, по релевантности."""
+    if not is_available(connection):
+        return queryset.filter(text__icontains=query)
+    match = build_match(query)
+    if not match:
+        return queryset.none()
+    return SearchResults(queryset, match)
+
+
+def filter_matching(queryset, query):
+    """Сужает queryset до постов, найденных в индексе."""
+    if not is_available(connection):
+        return queryset.filter(text__icontains=query)
+    match = build_match(query)
+    if not match:
+        return queryset.none()
+    return queryset.filter(pk__in=RawSQL(MATCH_SQL, [match]))
+
+
+def build_match(query):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки и ищется по префиксу, слова
+    объединяются через AND; операторы FTS5 из ввода не проходят.
+    """
+    words = re.findall(r'\w+', query or '')
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class SearchResults:
+    """Ранжированные результаты поиска для Paginator.
+
+    Срез выбирает из индекса только id нужной страницы, а посты
+    подгружаются одним запросом через for_feed().
+    """
+
+    def __init__(self, queryset, match):
+        self.queryset = queryset
+        self.match = match
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                [self.match],
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{MATCH_SQL} ORDER BY rank LIMIT %s OFFSET %s',
+                [self.match, key.stop - start, start],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
@@ -0,0 +1,177 @@
+"""Массовая загрузка постов из JSONL и CSV.
+
+Формат строк совпадает с выгрузкой из export: author — имя
+пользователя, group — slug группы. Авторы и группы ищутся по словарю
+в памяти, недостающие создаются пачкой. Посты пишутся через
+bulk_create, каждая пачка — в своей транзакции, и в той же
+транзакции в ImportOffset пишется номер последней записанной строки:
+после сбоя загрузка продолжается с него без повторов. Уже загруженные
+строки при продолжении пропускаются счётом, без разбора.
+"""
+import csv
+import json
+import os
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .bulk import BATCH_SIZE, sync_after_bulk
+from .export import parse_moment
+from .models import Group, ImportOffset, Post, User
+
+IMPORT_FORMATS = ('jsonl', 'csv')
+
+
+def guess_format(path):
+    extension = os.path.splitext(path)[1].lstrip('.').lower()
+    return extension if extension in IMPORT_FORMATS else 'jsonl'
+
+
+def skip_lines(stream, count):
+    """Пропускает count непустых строк JSONL, не разбирая их."""
+    for line in stream:
+        if count <= 0:
+            return line
+        if line.strip():
+            count -= 1
+    return None
+
+
+def read_rows(stream, import_format, offset=0):
+    """Словари строк входного потока после первых offset строк."""
+    if import_format == 'csv':
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            return
+        # Пустые строки csv.DictReader тоже пропускает; записи с
+        # переводами строк внутри кавычек разбирает только csv.
+        records = (values for values in reader if values)
+        for values in islice(records, offset, None):
+            yield dict(zip(header, values))
+        return
+    first = skip_lines(stream, offset) if offset else None
+    if first is not None and first.strip():
+        yield json.loads(first)
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_offset(source):
+    return ImportOffset.objects.filter(source=source).values_list(
+        'offset', flat=True
+    ).first() or 0
+
+
+def forget_offset(source):
+    ImportOffset.objects.filter(source=source).delete()
+
+
+class PostImporter:
+    """Пишет посты пачками, запоминая id авторов и групп."""
+
+    def __init__(self, batch_size=BATCH_SIZE, source=None):
+        self.batch_size = batch_size
+        self.source = source
+        self.authors = {}
+        self.groups = {}
+        self.touched_authors = set()
+        self.touched_groups = set()
+
+    def resolve_authors(self, usernames):
+        missing = set(usernames) - self.authors.keys()
+        if not missing:
+            return
+        self.authors.update(
+            User.objects.filter(username__in=missing).values_list(
+                'username', 'pk'
+            )
+        )
+        new = missing - self.authors.keys()
+        if new:
+            User.objects.bulk_create(
+                User(username=username, password=make_password(None))
+                for username in new
+            )
+            self.authors.update(
+                User.objects.filter(username__in=new).values_list(
+                    'username', 'pk'
+                )
+            )
+
+    def resolve_groups(self, rows):
+        titles = {}
+        for row in rows:
+            if not titles.get(row['group']):
+                titles[row['group']] = row.get('group_title')
+        missing = titles.keys() - self.groups.keys()
+        if not missing:
+            return
+        self.groups.update(
+            Group.objects.filter(slug__in=missing).values_list('slug', 'pk')
+        )
+        new = missing - self.groups.keys()
+        if new:
+            Group.objects.bulk_create(
+                Group(slug=slug, title=titles[slug] or slug, description='')
+                for slug in new
+            )
+            self.groups.update(
+                Group.objects.filter(slug__in=new).values_list('slug', 'pk')
+            )
+
+    def build_post(self, row, now):
+        author_id = self.authors[row['author']]
+        group_id = self.groups[row['group']] if row.get('group') else None
+        pub_date = parse_moment(row['pub_date']) if row.get(
+            'pub_date'
+        ) else now
+        return Post(
+            text=row['text'],
+            author_id=author_id,
+            group_id=group_id,
+            pub_date=pub_date,
+        )
+
+    def write_batch(self, rows, first_number):
+        for number, row in enumerate(rows, first_number):
+            if not row.get('author') or not row.get('text'):
+                raise ValueError(f'Строка {number}: нужны author и text')
+        now = timezone.now()
+        with transaction.atomic():
+            self.resolve_authors(row['author'] for row in rows)
+            self.resolve_groups([row for row in rows if row.get('group')])
+            posts = [self.build_post(row, now) for row in rows]
+            Post.objects.bulk_create(posts, keep_pub_date=True)
+            if self.source:
+                ImportOffset.objects.update_or_create(
+                    source=self.source,
+                    defaults={'offset': first_number + len(rows) - 1},
+                )
+        # Запоминаем только то, что уже зафиксировано в базе.
+        self.touched_authors.update(post.author_id for post in posts)
+        self.touched_groups.update(
+            post.group_id for post in posts if post.group_id
+        )
+
+    def run(self, rows, offset=0, on_batch=None):
+        """Пишет строки, идущие после offset уже загруженных.
+
+        rows начинаются сразу после них; on_batch(offset) вызывается
+        после каждой зафиксированной пачки.
+        """
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.write_batch(batch, offset + 1)
+            offset += len(batch)
+            if on_batch:
+                on_batch(offset)
+        return offset
+
+    def finish(self):
+        sync_after_bulk(self.touched_authors, self.touched_groups)
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from posts.benchmarks import benchmark_environment, measure
+from posts.bulk import seed_sample
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает размер ответа и время HTML-лент и JSON API. '
+        'Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument(
+            '--warm',
+            action='store_true',
+            help='Не сбрасывать кэш между запросами.',
+        )
+
+    def handle(self, *args, **options):
+        with benchmark_environment():
+            with transaction.atomic():
+                users, groups = seed_sample(
+                    options['posts'], 50, 10, prefix='bench-api'
+                )
+                self.compare(users[0].username, groups[0].slug, options)
+                transaction.set_rollback(True)
+
+    def compare(self, username, slug, options):
+        pairs = {
+            'index': (
+                reverse('posts:index'),
+                reverse('posts:api_post_list'),
+            ),
+            'group_list': (
+                reverse('posts:group_list', args=[slug]),
+                reverse('posts:api_group_posts', args=[slug]),
+            ),
+            'profile': (
+                reverse('posts:profile', args=[username]),
+                reverse('posts:api_author_posts', args=[username]),
+            ),
+        }
+        client = Client()
+        self.stdout.write(
+            f'{"лента":<12}{"формат":<8}{"байт":>8}'
+            f'{"p50, мс":>10}{"p95, мс":>10}'
+        )
+        for name, urls in pairs.items():
+            for label, url in zip(('html', 'json'), urls):
+                result = measure(
+                    client, url, options['repeat'], warm=options['warm']
+                )
+                self.stdout.write(
+                    f'{name:<12}{label:<8}{result["bytes"]:>8}'
+                    f'{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}'
+                )
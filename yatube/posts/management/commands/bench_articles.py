@@ -0,0 +1,111 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.utils import timezone
+
+from posts.benchmarks import private_cache
+from posts.models import Group, Post, User
+
+# прежняя разметка страниц: include карточки и {% url %} на каждый пост
+INCLUDE_SOURCE = (
+    '{% for post in posts %}'
+    "{% url 'posts:post_detail' post.pk as detail_url %}"
+    '{% if post.group %}'
+    "{% url 'posts:group_list' post.group.slug as group_url %}"
+    '{% endif %}'
+    "{% include 'posts/includes/article.html' with "
+    'pub_date=post.pub_date|date:"d E Y" last=forloop.last %}'
+    '{% endfor %}'
+)
+PAGE_SOURCE = (
+    '{% load articles %}{% article_cards posts as cards %}'
+    '{% for card in cards %}{{ card }}{% endfor %}'
+)
+# (подпись, шаблон, кэш не сбрасывается между отрисовками)
+MODES = (
+    ('include в цикле', INCLUDE_SOURCE, False),
+    ('article_cards, холодный', PAGE_SOURCE, False),
+    ('article_cards, тёплый', PAGE_SOURCE, True),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает отрисовку страницы карточек через include в цикле '
+        'и через article_cards с пустым и заполненным кэшем. Посты '
+        'создаются в памяти, база не нужна; кэш замера свой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10)
+        parser.add_argument('--repeat', type=int, default=500)
+
+    def handle(self, *args, **options):
+        with private_cache():
+            self.run(options)
+
+    def run(self, options):
+        posts = self.make_posts(options['posts'])
+        engine = engines.all()[0]
+        templates = {source: engine.from_string(source)
+                     for _, source, _ in MODES}
+        self.check_same_html(templates, posts)
+        self.stdout.write(
+            f'{"способ":<26}{"p50, мкс":>10}{"p95, мкс":>10}{"x":>7}'
+        )
+        baseline = None
+        for label, source, warm in MODES:
+            timings = self.measure(
+                templates[source], posts, options['repeat'], warm
+            )
+            p50 = statistics.median(timings)
+            p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+            baseline = baseline or p50
+            self.stdout.write(
+                f'{label:<26}{p50:>10.0f}{p95:>10.0f}{baseline / p50:>7.1f}'
+            )
+
+    def check_same_html(self, templates, posts):
+        cache.clear()
+        pages = {
+            templates[source].render({'posts': posts})
+            for _, source, _ in MODES
+        }
+        if len(pages) != 1:
+            raise CommandError('article_cards и include дают разный HTML.')
+
+    def make_posts(self, count):
+        author = User(
+            pk=1, username='bench', first_name='Лев', last_name='Толстой'
+        )
+        group = Group(pk=1, slug='bench', title='Группа')
+        now = timezone.now()
+        posts = []
+        for number in range(1, count + 1):
+            post = Post(
+                pk=number,
+                text='слово ' * (number * 10),
+                pub_date=now - timedelta(hours=number * 5),
+                author=author,
+                group=group if number % 2 else None,
+            )
+            post.fill_from_text()
+            posts.append(post)
+        return posts
+
+    def measure(self, template, posts, repeat, warm):
+        """Время отрисовки в микросекундах; без warm кэш пуст."""
+        timings = []
+        cache.clear()
+        template.render({'posts': posts})
+        for _ in range(repeat):
+            if not warm:
+                cache.clear()
+            started = time.perf_counter()
+            template.render({'posts': posts})
+            timings.append((time.perf_counter() - started) * 10**6)
+        return timings
@@ -0,0 +1,163 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from posts.benchmarks import (
+    benchmark_environment, check_budgets, compare_with_baseline, measure
+)
+from posts.bulk import sync_after_bulk
+from posts.models import Group, Post, User
+from posts.seed import Seeder
+
+DEFAULT_SIZES = '1000,10000,100000'
+DEFAULT_BUDGETS = os.path.join(settings.BASE_DIR, 'bench_budgets.json')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет представления на наборах данных растущего размера: '
+        'p50/p95, число SQL-запросов и размер ответа. Данные создаются '
+        'во временной транзакции и откатываются. Завершается ошибкой, '
+        'если нарушен бюджет или результат хуже базового прогона.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default=DEFAULT_SIZES,
+            help='Число постов в наборах через запятую.',
+        )
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--warm',
+            action='store_true',
+            help='Не сбрасывать кэш между запросами.',
+        )
+        parser.add_argument('--output', help='Куда записать JSON.')
+        parser.add_argument(
+            '--budgets',
+            default=DEFAULT_BUDGETS,
+            help='JSON с предельными значениями по представлениям.',
+        )
+        parser.add_argument(
+            '--baseline', help='JSON прошлого прогона для сравнения.'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Допустимое ухудшение времени и размера, доля.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('--sizes: числа через запятую.')
+        with benchmark_environment():
+            with transaction.atomic():
+                results = self.run_sizes(sizes, options)
+                transaction.set_rollback(True)
+        report = {
+            'options': {
+                key: options[key]
+                for key in ('users', 'groups', 'repeat', 'seed', 'warm')
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+        self.check_results(results, options)
+
+    def run_sizes(self, sizes, options):
+        seeder = Seeder(seed=options['seed'])
+        author_ids = seeder.create_users(options['users'])
+        group_ids = seeder.create_groups(options['groups'])
+        results = {}
+        seeded = 0
+        for size in sizes:
+            seeder.create_posts(size - seeded, author_ids, group_ids)
+            sync_after_bulk()
+            seeded = size
+            self.stdout.write(self.style.MIGRATE_HEADING(f'Постов: {size}'))
+            results[str(size)] = self.run_views(
+                User.objects.get(pk=author_ids[0]),
+                Group.objects.get(pk=group_ids[0]),
+                options,
+            )
+        return results
+
+    def run_views(self, author, group, options):
+        post = author.posts.first()
+        guest = Client()
+        writer = Client()
+        writer.force_login(author)
+        form = {'text': 'Пост для замера', 'group': group.pk}
+        edit_url = reverse('posts:post_edit', args=[post.pk])
+        views = {
+            'index': (guest, 'get', reverse('posts:index'), None),
+            'group_list': (
+                guest, 'get',
+                reverse('posts:group_list', args=[group.slug]), None
+            ),
+            'profile': (
+                guest, 'get',
+                reverse('posts:profile', args=[author.username]), None
+            ),
+            'post_detail': (
+                guest, 'get',
+                reverse('posts:post_detail', args=[post.pk]), None
+            ),
+            'post_create': (
+                writer, 'get', reverse('posts:post_create'), None
+            ),
+            'post_create:post': (
+                writer, 'post', reverse('posts:post_create'), form
+            ),
+            'post_edit': (writer, 'get', edit_url, None),
+            'post_edit:post': (writer, 'post', edit_url, form),
+        }
+        self.stdout.write(
+            f'{"представление":<18}{"p50, мс":>9}{"p95, мс":>9}'
+            f'{"запросы":>9}{"байт":>9}'
+        )
+        results = {}
+        for name, (client, method, url, data) in views.items():
+            result = measure(
+                client, url, options['repeat'], method=method, data=data,
+                warm=options['warm']
+            )
+            results[name] = result
+            self.stdout.write(
+                f'{name:<18}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}'
+                f'{result["queries"]:>9}{result["bytes"]:>9}'
+            )
+        # Созданные замером посты не должны копиться между наборами.
+        Post.objects.filter(text=form['text']).exclude(pk=post.pk).delete()
+        return results
+
+    def check_results(self, results, options):
+        violations = []
+        if options['budgets'] and os.path.exists(options['budgets']):
+            with open(options['budgets'], encoding='utf-8') as budgets:
+                violations += check_budgets(results, json.load(budgets))
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as baseline:
+                violations += compare_with_baseline(
+                    results, json.load(baseline)['results'],
+                    options['tolerance']
+                )
+        for violation in violations:
+            self.stderr.write(violation)
+        if violations:
+            raise CommandError(f'Нарушений бюджета: {len(violations)}')
+        self.stdout.write(self.style.SUCCESS('Бюджеты соблюдены.'))
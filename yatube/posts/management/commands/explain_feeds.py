@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from posts.bulk import seed_sample
+from posts.models import FeedEntry, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает EXPLAIN QUERY PLAN запросов лент с индексами и без них. '
+        'Данные для замера создаются во временной транзакции и '
+        'откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--authors', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            author, group = self.seed(options)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            self.explain_all(author, group, 'С индексами')
+            with connection.cursor() as cursor:
+                for index in Post._meta.indexes + FeedEntry._meta.indexes:
+                    cursor.execute(f'DROP INDEX "{index.name}"')
+            self.explain_all(author, group, 'Без индексов')
+            transaction.set_rollback(True)
+
+    def seed(self, options):
+        users, groups = seed_sample(
+            options['posts'], options['authors'], options['groups'],
+            seed=options['seed'], prefix='explain'
+        )
+        self.stdout.write(f'Добавлено постов: {options["posts"]}')
+        return users[0], groups[0]
+
+    def explain_all(self, author, group, title):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        feeds = {
+            'index': FeedEntry.objects.all(),
+            'group_list': group.posts.for_feed(),
+            'profile': author.posts.for_feed(),
+        }
+        for view, queryset in feeds.items():
+            started = time.perf_counter()
+            list(queryset[:10])
+            elapsed = (time.perf_counter() - started) * 1000
+            self.stdout.write(f'{view}: {elapsed:.2f} мс')
+            for detail in self.explain(queryset[:10], title):
+                self.stdout.write(f'  {detail}')
+
+    def explain(self, queryset, label):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            # Метка в комментарии не даёт sqlite3 взять из кэша план,
+            # подготовленный до удаления индексов.
+            cursor.execute(f'EXPLAIN QUERY PLAN /* {label} */ {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
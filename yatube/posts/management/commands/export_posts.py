@@ -0,0 +1,56 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты в JSONL или CSV, не загружая их в память.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=sorted(export.EXPORT_FORMATS), default='jsonl'
+        )
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument('--group', help='Slug группы.')
+        parser.add_argument(
+            '--since', help='Дата или дата со временем, включительно.'
+        )
+        parser.add_argument('--until', help='Дата или дата со временем.')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки; по умолчанию stdout.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        try:
+            posts = export.filter_posts(
+                author=options['author'],
+                group=options['group'],
+                since=options['since'],
+                until=options['until'],
+            )
+            lines = export.export_lines(
+                posts, options['format'], options['chunk_size']
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        written = 0
+        if options['output']:
+            with open(
+                options['output'], 'w', encoding='utf-8', newline=''
+            ) as output:
+                written = self.write_lines(output, lines)
+        else:
+            written = self.write_lines(sys.stdout, lines)
+        self.stderr.write(f'Выгружено строк: {written}')
+
+    @staticmethod
+    def write_lines(output, lines):
+        written = 0
+        for written, line in enumerate(lines, 1):
+            output.write(line)
+        return written
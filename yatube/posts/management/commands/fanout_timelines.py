@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.timeline import process_fanout
+
+
+class Command(BaseCommand):
+    help = 'Раскладывает новые посты по лентам подписчиков.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не выходить, а ждать новые посты.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1,
+            help='Пауза между проверками очереди в режиме --loop, секунды.',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            done = process_fanout(options['batch_size'])
+            total += done
+            if done:
+                self.stdout.write(f'Разложено постов: {done}')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово. Разложено постов: {total}.'
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import feed
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает или проверяет таблицу главной ленты.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только сравнить ленту с таблицей постов.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            total = feed.rebuild()
+            self.stdout.write(
+                self.style.SUCCESS(f'Лента перестроена, строк: {total}.')
+            )
+            return
+        mismatches = feed.find_mismatches()
+        for kind, pk in mismatches:
+            self.stdout.write(f'{kind} {pk}')
+        if mismatches:
+            raise CommandError(f'Расхождений: {len(mismatches)}')
+        self.stdout.write(self.style.SUCCESS('Лента совпадает с постами.'))
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.bulk import BATCH_SIZE
+from posts.importer import (
+    IMPORT_FORMATS, PostImporter, forget_offset, guess_format, read_offset,
+    read_rows
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из JSONL или CSV пачками. После сбоя повторный '
+        'запуск продолжает с последней записанной пачки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с постами или - для stdin.')
+        parser.add_argument('--format', choices=IMPORT_FORMATS)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--state',
+            help=(
+                'Имя источника в таблице ImportOffset; по умолчанию '
+                'полный путь к файлу.'
+            ),
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать с начала, забыв сохранённое состояние.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or guess_format(path)
+        source = options['state']
+        if source is None and path != '-':
+            source = os.path.abspath(path)
+        offset = 0
+        if source and options['restart']:
+            forget_offset(source)
+        elif source:
+            offset = read_offset(source)
+            if offset:
+                self.stdout.write(f'Продолжаем после строки {offset}.')
+        importer = PostImporter(options['batch_size'], source)
+        self.started = time.perf_counter()
+        self.first_offset = offset
+
+        stream = (
+            sys.stdin if path == '-'
+            else open(path, encoding='utf-8', newline='')
+        )
+        try:
+            done = importer.run(
+                read_rows(stream, import_format, offset), offset, self.report
+            )
+        except (ValueError, KeyError) as error:
+            raise CommandError(f'Загрузка остановлена: {error}')
+        finally:
+            importer.finish()
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {done - self.first_offset}.'
+        ))
+
+    def report(self, done):
+        elapsed = time.perf_counter() - self.started
+        written = done - self.first_offset
+        self.stdout.write(
+            f'{done} строк, {written / elapsed if elapsed else 0:.0f} строк/с'
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.counters import find_counter_mismatches, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает или проверяет счётчики постов авторов и групп.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только сравнить счётчики с таблицей постов.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            rebuild_counters()
+            self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны.'))
+            return
+        mismatches = find_counter_mismatches()
+        for kind, pk, stored, actual in mismatches:
+            self.stdout.write(
+                f'{kind} {pk}: сохранено {stored}, на самом деле {actual}'
+            )
+        if mismatches:
+            raise CommandError(f'Расхождений: {len(mismatches)}')
+        self.stdout.write(self.style.SUCCESS('Счётчики совпадают.'))
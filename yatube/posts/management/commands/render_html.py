@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from posts import rendered
+
+
+class Command(BaseCommand):
+    help = 'Дозаполняет сохранённый HTML текстов постов и описаний групп.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=rendered.BATCH_SIZE
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перерендерить все строки, а не только строки без HTML.',
+        )
+
+    def handle(self, *args, **options):
+        for model in rendered.TARGETS:
+            name = model._meta.model_name
+            total = rendered.backfill(
+                model,
+                batch_size=options['batch_size'],
+                everything=options['all'],
+                on_batch=lambda model, done: self.stdout.write(
+                    f'{model._meta.model_name}: {done}'
+                ),
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'{name}: обновлено строк {total}.')
+            )
@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.bulk import BATCH_SIZE
+from posts.export import parse_moment
+from posts.seed import SEED_NOW, Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу пользователями, группами и постами для замеров. '
+        'Одинаковое --seed даёт одинаковые данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--skew',
+            type=float,
+            default=1.1,
+            help='Показатель закона Ципфа для авторов и групп.',
+        )
+        parser.add_argument(
+            '--no-group',
+            type=float,
+            default=0.3,
+            help='Доля постов без группы.',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365, help='За сколько дней посты.'
+        )
+        parser.add_argument(
+            '--now',
+            default=SEED_NOW.isoformat(),
+            help='Момент, от которого назад идут даты постов.',
+        )
+        parser.add_argument(
+            '--password',
+            help='Общий пароль пользователей; без него войти нельзя.',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['posts'] and not options['users']:
+            raise CommandError('Для постов нужен хотя бы один пользователь.')
+        if not 0 <= options['no_group'] <= 1:
+            raise CommandError('--no-group должен быть от 0 до 1.')
+        try:
+            now = parse_moment(options['now'])
+        except ValueError as error:
+            raise CommandError(error)
+        seeder = Seeder(
+            seed=options['seed'],
+            skew=options['skew'],
+            no_group=options['no_group'],
+            days=options['days'],
+            batch_size=options['batch_size'],
+            now=now,
+        )
+        started = time.perf_counter()
+
+        def progress(done):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{done} постов, {done / elapsed:.0f} постов/с'
+            )
+
+        seeder.run(
+            options['users'],
+            options['groups'],
+            options['posts'],
+            password=options['password'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {options["users"]}, групп '
+            f'{options["groups"]}, постов {options["posts"]} за '
+            f'{time.perf_counter() - started:.1f} с.'
+        ))
@@ -0,0 +1,76 @@
+# Generated by Django 2.2.6 on 2026-10-18 18:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import Truncator
+
+# Замороженные копии помощников posts.feed на момент миграции.
+CHUNK_SIZE = 2000
+EXCERPT_LENGTH = 300
+
+
+def make_excerpt(text):
+    return Truncator(text).chars(EXCERPT_LENGTH)
+
+
+def fill_feed(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    FeedEntry = apps.get_model('posts', 'FeedEntry')
+    posts = Post.objects.select_related('author', 'group').order_by('pk')
+    last = 0
+    while True:
+        chunk = list(posts.filter(pk__gt=last)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        # у исторической модели пользователя нет get_full_name
+        FeedEntry.objects.bulk_create(
+            FeedEntry(
+                pk=post.pk,
+                pub_date=post.pub_date,
+                author_id=post.author_id,
+                author_username=post.author.username,
+                author_name=(
+                    f'{post.author.first_name} {post.author.last_name}'
+                ).strip(),
+                group_id=post.group_id,
+                group_slug=post.group.slug if post.group else '',
+                group_title=post.group.title if post.group else '',
+                excerpt=make_excerpt(post.text),
+            )
+            for post in chunk
+        )
+        last = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0009_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False, verbose_name='id поста')),
+                ('pub_date', models.DateTimeField()),
+                ('author_username', models.CharField(max_length=150)),
+                ('author_name', models.CharField(blank=True, max_length=300)),
+                ('group_slug', models.CharField(blank=True, max_length=50)),
+                ('group_title', models.CharField(blank=True, max_length=200)),
+                ('excerpt', models.TextField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='posts.Group')),
+            ],
+            options={
+                'ordering': ['-pub_date', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['-pub_date', '-id'], name='feed_entry_idx'),
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
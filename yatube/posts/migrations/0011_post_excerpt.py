@@ -0,0 +1,106 @@
+# Generated by Django 2.2.6 on 2026-10-18 18:37
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+# Замороженные копии помощников posts.models на момент миграции.
+CHUNK_SIZE = 2000
+EXCERPT_WORDS = 50
+
+
+def make_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS)
+
+
+def count_words(text):
+    return len(text.split())
+
+
+# Замороженная копия индекса и триггеров поиска на момент миграции:
+# код приложения может меняться, а миграции должны работать как были.
+FTS_TABLE = 'posts_post_fts'
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='posts_post', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+    f"AFTER INSERT ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+    f"AFTER DELETE ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+    f"AFTER UPDATE OF text ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); "
+    f"END",
+)
+REBUILD_FTS_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def install_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_FTS_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(REBUILD_FTS_SQL)
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    FeedEntry = apps.get_model('posts', 'FeedEntry')
+    posts = Post.objects.only('text').order_by('pk')
+    last = 0
+    while True:
+        chunk = list(posts.filter(pk__gt=last)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        for post in chunk:
+            post.excerpt = make_excerpt(post.text)
+            post.word_count = count_words(post.text)
+        Post.objects.bulk_update(chunk, ['excerpt', 'word_count'])
+        FeedEntry.objects.bulk_update(
+            [
+                FeedEntry(
+                    pk=post.pk, excerpt=post.excerpt,
+                    word_count=post.word_count
+                )
+                for post in chunk
+            ],
+            ['excerpt', 'word_count']
+        )
+        last = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_feed_entry'),
+    ]
+
+    operations = [
+        # Откатывается последней: обратная AddField пересоздаёт таблицу
+        # постов, и триггеры поиска ставятся заново уже после этого.
+        migrations.RunPython(migrations.RunPython.noop, install_fts),
+        migrations.AddField(
+            model_name='feedentry',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(default='', editable=False, verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество слов'),
+        ),
+        # SQLite пересоздал таблицу постов и потерял триггеры поиска.
+        migrations.RunPython(install_fts, migrations.RunPython.noop),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
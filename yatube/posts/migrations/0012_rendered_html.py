@@ -0,0 +1,60 @@
+# Generated by Django 2.2.6 on 2026-10-18 18:39
+
+from django.db import migrations, models
+
+# Замороженная копия индекса и триггеров поиска на момент миграции:
+# код приложения может меняться, а миграции должны работать как были.
+FTS_TABLE = 'posts_post_fts'
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"text, content='posts_post', content_rowid='id')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert "
+    f"AFTER INSERT ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete "
+    f"AFTER DELETE ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+    f"AFTER UPDATE OF text ON posts_post BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+    f"VALUES ('delete', old.id, old.text); "
+    f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); "
+    f"END",
+)
+REBUILD_FTS_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def install_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_FTS_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(REBUILD_FTS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_excerpt'),
+    ]
+
+    operations = [
+        # Откатывается последней: обратная AddField пересоздаёт таблицу
+        # постов, и триггеры поиска ставятся заново уже после этого.
+        migrations.RunPython(migrations.RunPython.noop, install_fts),
+        migrations.AddField(
+            model_name='group',
+            name='description_html',
+            field=models.TextField(default='', editable=False, verbose_name='HTML описания'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='HTML текста'),
+        ),
+        # SQLite пересоздал таблицу постов и потерял триггеры поиска.
+        migrations.RunPython(install_fts, migrations.RunPython.noop),
+    ]
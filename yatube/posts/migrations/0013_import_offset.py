@@ -0,0 +1,21 @@
+# Generated by Django 2.2.6 on 2026-10-18 18:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_rendered_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportOffset',
+            fields=[
+                ('source', models.CharField(max_length=500, primary_key=True, serialize=False, verbose_name='Источник')),
+                ('offset', models.PositiveIntegerField(default=0, verbose_name='Загружено строк')),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
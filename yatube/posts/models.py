@@ -1,17 +1,137 @@
-from django.db import models
+import copy
+
+from django.db import models, transaction
+from django.db.models.query import ModelIterable
 from django.contrib.auth import get_user_model
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
 
 User = get_user_model()
 
+# сколько слов текста показывать в лентах
+EXCERPT_WORDS = 50
+
+
+def make_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS)
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def render_text(text):
+    """HTML текста: то же, что фильтр linebreaks в шаблоне."""
+    return linebreaks(text, autoescape=True)
+
+
+class GroupQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # save() здесь не вызывается: HTML описания готовится до вставки.
+        objs = list(objs)
+        for group in objs:
+            group.render_description()
+        return super().bulk_create(objs, *args, **kwargs)
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=50, unique=True)
     description = models.TextField()
+    description_html = models.TextField(
+        'HTML описания',
+        editable=False,
+        default=''
+    )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False
+    )
+
+    objects = GroupQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    def render_description(self):
+        self.description_html = render_text(self.description)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'description' in update_fields:
+            self.render_description()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'description_html'
+                }
+        super().save(*args, **kwargs)
+
+
+class PostQuerySet(models.QuerySet):
+    # поля, которые нужны шаблонам лент; полный текст в них не входит
+    FEED_FIELDS = (
+        'excerpt', 'word_count', 'pub_date',
+        'author', 'author__username',
+        'author__first_name', 'author__last_name',
+        'group', 'group__slug', 'group__title',
+    )
+    _keep_pub_date = False
+
+    def for_feed(self):
+        """Посты для лент: автор и группа одним JOIN, без лишних полей."""
+        return self.select_related('author', 'group').only(*self.FEED_FIELDS)
+
+    def bulk_create(self, objs, *args, keep_pub_date=False, **kwargs):
+        """Вставка пачкой вместе со строками ленты и очередью fan-out.
+
+        save() и сигналы здесь не вызываются, поэтому поля, производные
+        от текста, считаются до вставки, а строки FeedEntry и задачи
+        FanoutTask добавляются сразу после неё. SQLite не возвращает
+        id вставленных строк, и новые посты ищутся по id больше
+        прежнего наибольшего.
+        С keep_pub_date посты сохраняют свой pub_date.
+        """
+        # feed и timeline импортируют модели, поэтому импорт здесь
+        from . import feed, timeline
+
+        objs = list(objs)
+        for post in objs:
+            post.fill_from_text()
+        self._keep_pub_date = keep_pub_date
+        with transaction.atomic(using=self.db, savepoint=False):
+            last = self.model._base_manager.using(self.db).aggregate(
+                last=models.Max('pk')
+            )['last'] or 0
+            created = super().bulk_create(objs, *args, **kwargs)
+            pks = [post.pk for post in created]
+            if all(pks):
+                new = self.model._base_manager.filter(pk__in=pks)
+            else:
+                new = self.model._base_manager.filter(pk__gt=last)
+            feed.add_missing(new.using(self.db))
+            timeline.queue_fanout(new.using(self.db).values_list(
+                'pk', flat=True
+            ))
+        return created
+
+    def _batched_insert(self, objs, fields, *args, **kwargs):
+        # auto_now_add отключается у копии поля только для этой
+        # вставки: само поле модели общее для всех потоков.
+        if self._keep_pub_date:
+            fields = [
+                self._field_without_auto_now(field)
+                if field.name == 'pub_date' else field
+                for field in fields
+            ]
+        return super()._batched_insert(objs, fields, *args, **kwargs)
+
+    @staticmethod
+    def _field_without_auto_now(field):
+        field = copy.copy(field)
+        field.auto_now_add = False
+        return field
+
 
 class Post(models.Model):
     text = models.TextField(
@@ -22,6 +142,10 @@ class Post(models.Model):
         'Дата публикации',
         auto_now_add=True
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -38,8 +162,282 @@ class Post(models.Model):
         help_text='Группа, к которой будет относиться пост',
     )
 
+    excerpt = models.TextField(
+        'Начало текста',
+        editable=False,
+        default=''
+    )
+    word_count = models.PositiveIntegerField(
+        'Количество слов',
+        editable=False,
+        default=0
+    )
+    text_html = models.TextField(
+        'HTML текста',
+        editable=False,
+        default=''
+    )
+
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         return self.text[:15]
 
+    @property
+    def is_truncated(self):
+        """В лентах показан не весь текст."""
+        return self.word_count > EXCERPT_WORDS
+
+    def fill_from_text(self):
+        """Считает начало текста, число слов и HTML текста."""
+        self.excerpt = make_excerpt(self.text)
+        self.word_count = count_words(self.text)
+        self.text_html = render_text(self.text)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.fill_from_text()
+            if update_fields is not None:
+                kwargs['update_fields'] = {
+                    *update_fields, 'excerpt', 'word_count', 'text_html'
+                }
+        # Счётчики постов обновляются в сигналах — в той же транзакции.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        # индексы повторяют порядок лент: главной, группы и автора
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_feed_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_feed_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx'
+            ),
+            # для валидаторов условных GET-запросов: MAX(updated)
+            models.Index(fields=['updated'], name='post_updated_idx'),
+            models.Index(
+                fields=['group', 'updated'],
+                name='post_group_updated_idx'
+            ),
+            models.Index(
+                fields=['author', 'updated'],
+                name='post_author_updated_idx'
+            ),
+        ]
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='follow_unique'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='follow_not_self'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя (fan-out при записи).
+
+    pub_date и author копируются из поста: лента читается по индексу
+    (user, -pub_date, -post) без обращения к таблице постов, а
+    отписка удаляет записи автора одним запросом.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='timeline_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_feed_idx'
+            ),
+            models.Index(
+                fields=['user', 'author'],
+                name='timeline_author_idx'
+            ),
+        ]
+
+
+class FanoutTask(models.Model):
+    """Новый пост, ещё не разложенный по лентам подписчиков."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+
+class FeedPostIterable(ModelIterable):
+    """Строки ленты в виде постов для шаблонов и пагинаторов."""
+
+    def __iter__(self):
+        for entry in super().__iter__():
+            yield entry.as_post()
+
+
+class FeedEntryQuerySet(models.QuerySet):
+    def as_posts(self):
+        """Выборка, которая отдаёт посты, собранные из строк ленты."""
+        clone = self._chain()
+        clone._iterable_class = FeedPostIterable
+        return clone
+
+
+class FeedEntry(models.Model):
+    """Строка главной ленты с готовыми для карточки полями.
+
+    Имена автора и группы и начало текста скопированы из связанных
+    таблиц, поэтому страница главной читается одним проходом по
+    индексу (-pub_date, -id) без JOIN. Ключ строки — id поста, так
+    что курсоры главной совпадают с курсорами лент по постам. Это
+    простое поле, а не связь: сортировка по связи потянула бы JOIN
+    с постами ради их порядка. Строки поддерживаются сигналами,
+    а команда feed_entries перестраивает и проверяет таблицу.
+    """
+    id = models.IntegerField('id поста', primary_key=True)
+    pub_date = models.DateTimeField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    author_username = models.CharField(max_length=150)
+    author_name = models.CharField(max_length=300, blank=True)
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        blank=True,
+        null=True,
+    )
+    group_slug = models.CharField(max_length=50, blank=True)
+    group_title = models.CharField(max_length=200, blank=True)
+    excerpt = models.TextField()
+    word_count = models.PositiveIntegerField(default=0)
+
+    objects = FeedEntryQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='feed_entry_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.pk}: {self.excerpt[:15]}'
+
+    def as_post(self):
+        """Пост для карточки без обращения к базе.
+
+        Загружены только поля карточки, остальные, включая текст,
+        отложены и дочитываются при обращении. Значения для from_db
+        идут в порядке полей модели. Полное имя автора кладётся
+        в first_name, чтобы get_full_name() вернуло его как есть.
+        """
+        db = self._state.db
+        post = Post.from_db(
+            db,
+            ['id', 'pub_date', 'author_id', 'group_id', 'excerpt',
+             'word_count'],
+            [self.pk, self.pub_date, self.author_id, self.group_id,
+             self.excerpt, self.word_count]
+        )
+        post.author = User.from_db(
+            db, ['id', 'username', 'first_name', 'last_name'],
+            [self.author_id, self.author_username, self.author_name, '']
+        )
+        if self.group_id is not None:
+            post.group = Group.from_db(
+                db, ['id', 'title', 'slug'],
+                [self.group_id, self.group_title, self.group_slug]
+            )
+        return post
+
+
+class ImportOffset(models.Model):
+    """Сколько строк источника уже загружено командой import_posts.
+
+    Обновляется в той же транзакции, что и пачка постов, поэтому
+    после сбоя номер строки не отстаёт от записанных постов.
+    """
+    source = models.CharField('Источник', max_length=500, primary_key=True)
+    offset = models.PositiveIntegerField('Загружено строк', default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.source}: {self.offset}'
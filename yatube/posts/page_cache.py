@@ -0,0 +1,144 @@
+"""Кэш целых страниц лент.
+
+Каждая страница зависит от набора областей: вся лента (feed), автор,
+группа, пост. У области есть метка версии; при изменении данных
+сигналы меняют метки затронутых областей, и старые страницы перестают
+находиться в кэше.
+
+Метки видны другим процессам, только если кэш у них общий. С
+LocMemCache по умолчанию у каждого процесса свой кэш, и устаревшую
+страницу другой процесс отдаёт до конца PAGE_CACHE_TIMEOUT, поэтому
+в settings он короткий; поднимать его можно только вместе
+с переходом на общий кэш (memcached, redis).
+"""
+import hashlib
+from functools import wraps
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.utils.translation import get_language
+
+from .models import Group, Post, User
+
+# параметры запроса, от которых зависит содержимое страниц лент
+PAGE_PARAMS = ('page', 'cursor')
+
+
+def scope_key(scope):
+    return f'page:scope:{scope}'
+
+
+def expire(*scopes):
+    """Делает недействительными страницы, зависящие от областей."""
+    cache.set_many(
+        {scope_key(scope): uuid4().hex[:8] for scope in scopes}, None
+    )
+
+
+def get_versions(scopes):
+    keys = [scope_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid4().hex[:8], None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def cached_lookup(name, loader):
+    """Значение из кэша или из loader(); None не кэшируется."""
+    key = f'page:lookup:{name}'
+    value = cache.get(key)
+    if value is None:
+        value = loader()
+        if value is not None:
+            cache.set(key, value, settings.PAGE_CACHE_TIMEOUT)
+    return value
+
+
+def forget(kind, natural_key):
+    """Сбрасывает сохранённое соответствие имени объекта его id."""
+    cache.delete(f'page:lookup:{kind}:{natural_key}')
+
+
+def index_scopes():
+    return ['feed']
+
+
+def group_scopes(slug):
+    group_id = cached_lookup(
+        f'group:{slug}',
+        Group.objects.filter(slug=slug).values_list('pk', flat=True).first
+    )
+    if group_id is None:
+        return None
+    return [f'group:{group_id}']
+
+
+def profile_scopes(username):
+    author_id = cached_lookup(
+        f'author:{username}',
+        User.objects.filter(
+            username=username
+        ).values_list('pk', flat=True).first
+    )
+    if author_id is None:
+        return None
+    return [f'author:{author_id}']
+
+
+def post_scopes(post_id):
+    refs = cached_lookup(
+        f'post:{post_id}',
+        Post.objects.filter(pk=post_id).values_list(
+            'author_id', 'group_id'
+        ).first
+    )
+    if refs is None:
+        return None
+    author_id, group_id = refs
+    return [f'post:{post_id}', f'author:{author_id}', f'group:{group_id}']
+
+
+def page_key(request, view_name, kwargs, scopes):
+    params = [request.GET.get(name, '') for name in PAGE_PARAMS]
+    raw = '|'.join([
+        view_name,
+        repr(sorted(kwargs.items())),
+        *params,
+        *get_versions(scopes),
+        get_language() or '',
+    ])
+    return 'page:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def cache_shared_page(get_scopes):
+    """Кэширует страницу, общую для всех посетителей.
+
+    get_scopes получает аргументы представления и возвращает
+    области страницы; None значит «не кэшировать» (например, 404).
+    Личная шапка вырезана из страниц в edge include, поэтому одна
+    и та же страница отдаётся и гостям, и авторизованным. Ответ
+    помечается public: его может хранить и общий прокси, проверяя
+    актуальность по ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            scopes = get_scopes(**kwargs)
+            if not scopes:
+                return view(request, *args, **kwargs)
+            key = page_key(request, view.__name__, kwargs, scopes)
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.cookies:
+                    cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            patch_cache_control(response, public=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
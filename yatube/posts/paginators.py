@@ -0,0 +1,175 @@
+import base64
+import binascii
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+# сколько страниц показывать по обе стороны от текущей
+PAGE_WINDOW = 2
+# сколько записей считать точно, прежде чем перейти к оценке
+COUNT_LIMIT = 10000
+
+
+def encode_cursor(direction, pub_date, pk):
+    """Упаковывает позицию в ленте в непрозрачную строку."""
+    raw = f'{direction}|{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Распаковывает курсор; при ошибке возвращает None."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (TypeError, ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class EstimatedPaginator(Paginator):
+    """Paginator, который не считает больше COUNT_LIMIT записей.
+
+    Подсчёт идёт по подзапросу с LIMIT, поэтому на больших лентах
+    его стоимость ограничена. Если записей больше порога, count
+    становится оценкой снизу, а is_estimated — True. Номер страницы
+    дальше оценки сводится к последней посчитанной странице, как
+    и номер за концом ленты: глубже ведёт пагинация по курсору.
+    """
+    is_estimated = False
+
+    def __init__(self, object_list, per_page, count_limit=COUNT_LIMIT):
+        super().__init__(object_list, per_page)
+        self.count_limit = count_limit
+
+    @cached_property
+    def count(self):
+        counted = self.object_list[:self.count_limit + 1].count()
+        if counted > self.count_limit:
+            self.is_estimated = True
+            return self.count_limit
+        return counted
+
+
+class CursorPage(Page):
+    """Страница ленты, совместимая с Page, но без номера и подсчёта."""
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        super().__init__(object_list, None, paginator)
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<Cursor page>'
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def _no_number(self, *args, **kwargs):
+        raise TypeError(
+            'У страницы по курсору нет номера: используйте '
+            'next_cursor и previous_cursor'
+        )
+
+    next_page_number = previous_page_number = _no_number
+    start_index = end_index = _no_number
+
+
+class CursorPaginator(Paginator):
+    """Пагинация по ключу (pub_date, id) вместо COUNT(*) и OFFSET.
+
+    Любая страница ленты стоит столько же, сколько первая: запрос
+    опирается на позицию последнего показанного поста, а не на номер
+    страницы.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list, per_page):
+        super().__init__(object_list.order_by('-pub_date', '-pk'), per_page)
+
+    @staticmethod
+    def get_key(item):
+        if isinstance(item, dict):
+            return item['pub_date'], item['id']
+        return item.pub_date, item.pk
+
+    def get_page(self, cursor):
+        """Возвращает страницу по курсору, при ошибке — первую."""
+        position = decode_cursor(cursor) if cursor else None
+        if position is None:
+            return self.first_page()
+        direction, pub_date, pk = position
+        if direction == CURSOR_PREVIOUS:
+            return self.page_before(pub_date, pk)
+        return self.page_after(pub_date, pk)
+
+    @staticmethod
+    def keyset(pub_date, pk, forward, pk_field='pk'):
+        """Условие «после (pub_date, pk)» в направлении выборки."""
+        if forward:
+            return Q(pub_date__lte=pub_date) & (
+                Q(pub_date__lt=pub_date) | Q(**{f'{pk_field}__lt': pk})
+            )
+        return Q(pub_date__gte=pub_date) & (
+            Q(pub_date__gt=pub_date) | Q(**{f'{pk_field}__gt': pk})
+        )
+
+    def fetch(self, position=None, forward=True):
+        """Строки после позиции с запасом в одну.
+
+        forward — в порядке ленты, иначе в обратном, ближайшие к
+        позиции первыми.
+        """
+        rows = self.object_list
+        if not forward:
+            rows = rows.order_by('pub_date', 'pk')
+        if position is not None:
+            rows = rows.filter(self.keyset(*position, forward))
+        return list(rows[:self.per_page + 1])
+
+    def first_page(self):
+        return self._build_page(self.fetch(), has_more=False, forward=True)
+
+    def page_after(self, pub_date, pk):
+        rows = self.fetch((pub_date, pk), forward=True)
+        return self._build_page(rows, has_more=True, forward=True)
+
+    def page_before(self, pub_date, pk):
+        rows = self.fetch((pub_date, pk), forward=False)
+        if len(rows) <= self.per_page:
+            # Дошли до начала ленты: отдаём полную первую страницу.
+            return self.first_page()
+        return self._build_page(rows, has_more=True, forward=False)
+
+    def _build_page(self, rows, has_more, forward):
+        """Собирает страницу из строк, выбранных с запасом в одну.
+
+        Лишняя строка говорит о том, что в направлении выборки
+        есть ещё посты; has_more — что они есть в обратную сторону.
+        """
+        has_extra = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        has_next, has_previous = (
+            (has_extra, has_more) if forward else (has_more, has_extra)
+        )
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(CURSOR_NEXT, *self.get_key(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(
+                CURSOR_PREVIOUS, *self.get_key(rows[0])
+            )
+        return CursorPage(rows, self, next_cursor, previous_cursor)
@@ -0,0 +1,45 @@
+"""HTML текстов, подготовленный при записи.
+
+Пост и группа хранят рядом с текстом его HTML — результат фильтра
+linebreaks, — и страницы выводят его как есть. Модели пересчитывают
+HTML в save() и bulk_create; строки, записанные до появления этих
+полей, дозаполняет команда render_html, а до того шаблоны
+рендерят текст сами.
+"""
+from django.db import transaction
+
+from .models import Group, Post, render_text
+
+BATCH_SIZE = 1000
+# модель -> (поле текста, поле HTML)
+TARGETS = {
+    Post: ('text', 'text_html'),
+    Group: ('description', 'description_html'),
+}
+
+
+def backfill(model, batch_size=BATCH_SIZE, everything=False,
+             on_batch=None):
+    """Заполняет HTML пачками; возвращает число обновлённых строк.
+
+    Без everything берутся только строки без HTML, с ним — все,
+    например после смены способа рендеринга.
+    """
+    source, target = TARGETS[model]
+    rows = model.objects.only(source).order_by('pk')
+    if not everything:
+        rows = rows.filter(**{target: ''})
+    done = 0
+    last = 0
+    while True:
+        chunk = list(rows.filter(pk__gt=last)[:batch_size])
+        if not chunk:
+            return done
+        for obj in chunk:
+            setattr(obj, target, render_text(getattr(obj, source)))
+        with transaction.atomic():
+            model.objects.bulk_update(chunk, [target])
+        done += len(chunk)
+        last = chunk[-1].pk
+        if on_batch:
+            on_batch(model, done)
@@ -0,0 +1,132 @@
+"""Генератор большого набора данных для замеров.
+
+Активность авторов и наполненность групп распределены по закону Ципфа:
+немногие авторы пишут большую часть постов, как и бывает на живых
+сайтах. Длина текста логнормальна. Даты постов отсчитываются назад
+от постоянного момента SEED_NOW, а не от текущего времени, поэтому
+одинаковое зерно при той же версии Faker даёт одинаковые данные.
+"""
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+from django.utils.timezone import utc
+from faker import Faker
+
+from .bulk import BATCH_SIZE, sync_after_bulk
+from .models import Group, Post, User
+
+SEED_LOCALE = 'ru_RU'
+# сколько разных предложений заготовить для текстов постов
+SENTENCE_POOL = 2000
+MAX_SENTENCES = 60
+# от этого момента назад раскладываются даты постов
+SEED_NOW = datetime(2024, 1, 1, tzinfo=utc)
+
+
+def zipf_weights(count, skew):
+    """Накопленные веса рангов 1..count для random.choices."""
+    return list(accumulate(1 / rank ** skew for rank in range(1, count + 1)))
+
+
+def new_ids(model, after):
+    return list(
+        model.objects.filter(pk__gt=after).order_by('pk').values_list(
+            'pk', flat=True
+        )
+    )
+
+
+class Seeder:
+    """Создаёт пользователей, группы и посты пачками через bulk_create."""
+
+    def __init__(self, seed=1, skew=1.1, no_group=0.3, days=365,
+                 batch_size=BATCH_SIZE, now=SEED_NOW):
+        self.rnd = random.Random(seed)
+        self.fake = Faker(SEED_LOCALE)
+        self.fake.seed_instance(seed)
+        self.seed = seed
+        self.skew = skew
+        self.no_group = no_group
+        self.days = days
+        self.now = now
+        self.batch_size = batch_size
+        self.sentences = [
+            self.fake.sentence(nb_words=self.rnd.randint(3, 15))
+            for _ in range(SENTENCE_POOL)
+        ]
+
+    def create_users(self, count, password=None):
+        # Хэш дорогой, поэтому он один на всех.
+        password = make_password(password)
+        after = User.objects.aggregate(last=Max('pk'))['last'] or 0
+        for start in range(0, count, self.batch_size):
+            User.objects.bulk_create(
+                User(
+                    username=f'{self.fake.user_name()}-{self.seed}-{i}',
+                    first_name=self.fake.first_name(),
+                    last_name=self.fake.last_name(),
+                    password=password,
+                )
+                for i in range(start, min(start + self.batch_size, count))
+            )
+        return new_ids(User, after)
+
+    def create_groups(self, count):
+        after = Group.objects.aggregate(last=Max('pk'))['last'] or 0
+        Group.objects.bulk_create(
+            Group(
+                title=self.fake.catch_phrase()[:200],
+                slug=f'seed-{self.seed}-{i}',
+                description=self.fake.paragraph(),
+            )
+            for i in range(count)
+        )
+        return new_ids(Group, after)
+
+    def make_text(self):
+        sentences = min(
+            MAX_SENTENCES, max(1, int(self.rnd.lognormvariate(1.2, 0.9)))
+        )
+        return ' '.join(self.rnd.choices(self.sentences, k=sentences))
+
+    def create_posts(self, count, author_ids, group_ids, progress=None):
+        author_weights = zipf_weights(len(author_ids), self.skew)
+        group_weights = zipf_weights(len(group_ids), self.skew)
+        span = self.days * 24 * 60 * 60
+        for start in range(0, count, self.batch_size):
+            size = min(self.batch_size, count - start)
+            authors = self.rnd.choices(
+                author_ids, cum_weights=author_weights, k=size
+            )
+            groups = self.rnd.choices(
+                group_ids, cum_weights=group_weights, k=size
+            ) if group_ids else [None] * size
+            Post.objects.bulk_create(
+                (
+                    Post(
+                        text=self.make_text(),
+                        author_id=author_id,
+                        group_id=(
+                            None if self.rnd.random() < self.no_group
+                            else group_id
+                        ),
+                        pub_date=self.now - timedelta(
+                            seconds=self.rnd.randrange(span)
+                        ),
+                    )
+                    for author_id, group_id in zip(authors, groups)
+                ),
+                keep_pub_date=True,
+            )
+            if progress:
+                progress(start + size)
+
+    def run(self, users, groups, posts, password=None, progress=None):
+        author_ids = self.create_users(users, password)
+        group_ids = self.create_groups(groups)
+        self.create_posts(posts, author_ids, group_ids, progress)
+        sync_after_bulk(author_ids, group_ids)
+        return author_ids, group_ids
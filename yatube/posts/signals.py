@@ -0,0 +1,175 @@
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from . import feed, page_cache, timeline
+from .counters import (
+    change_author_followers_count, change_author_posts_count,
+    change_group_posts_count
+)
+from .fragments import bump_version
+from .models import FanoutTask, Follow, Group, Post, TimelineEntry, User
+
+# поля автора, которые видны в карточках постов
+AUTHOR_DISPLAY_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+def touches_author_display(update_fields):
+    return update_fields is None or bool(
+        AUTHOR_DISPLAY_FIELDS & set(update_fields)
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_origin(sender, instance, **kwargs):
+    """Запоминает автора и группу поста до изменения."""
+    instance._origin = None
+    if instance.pk and not instance._state.adding:
+        instance._origin = Post.objects.filter(pk=instance.pk).values_list(
+            'author_id', 'group_id'
+        ).first()
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    origin = getattr(instance, '_origin', None)
+    old_author, old_group = origin or (None, None)
+    if instance.author_id != old_author:
+        change_author_posts_count(instance.author_id, 1)
+        if old_author is not None:
+            change_author_posts_count(old_author, -1)
+    if instance.group_id != old_group:
+        if instance.group_id is not None:
+            change_group_posts_count(instance.group_id, 1)
+        if old_group is not None:
+            change_group_posts_count(old_group, -1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_author_posts_count(instance.author_id, -1)
+    if instance.group_id is not None:
+        change_group_posts_count(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        change_author_followers_count(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    change_author_followers_count(instance.author_id, -1)
+    timeline.follower_lost(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def queue_fanout(sender, instance, created, **kwargs):
+    """Ставит пост в очередь раскладки по лентам подписчиков."""
+    origin = getattr(instance, '_origin', None)
+    if not created and (origin is None or origin[0] == instance.author_id):
+        return
+    if created:
+        FanoutTask.objects.create(post=instance)
+        return
+    # У поста сменился автор: записи старых подписчиков не нужны.
+    TimelineEntry.objects.filter(post=instance).delete()
+    FanoutTask.objects.get_or_create(post=instance)
+
+
+@receiver(post_save, sender=Post)
+def save_feed_entry(sender, instance, created, **kwargs):
+    feed.save_post(instance, created)
+
+
+@receiver(post_delete, sender=Post)
+def delete_feed_entry(sender, instance, **kwargs):
+    feed.delete_post(instance)
+
+
+@receiver(post_save, sender=User)
+def rename_author_in_feed(sender, instance, created, update_fields,
+                          **kwargs):
+    if not created and touches_author_display(update_fields):
+        feed.rename_author(instance)
+
+
+@receiver(post_save, sender=Group)
+def rename_group_in_feed(sender, instance, created, **kwargs):
+    if not created:
+        feed.rename_group(instance)
+
+
+@receiver(pre_delete, sender=Group)
+def remove_group_from_feed(sender, instance, **kwargs):
+    feed.forget_group(instance)
+
+
+@receiver(post_save, sender=Post)
+def expire_post_fragments(sender, instance, **kwargs):
+    bump_version('post', instance.pk)
+
+
+@receiver(post_save, sender=Group)
+def expire_group_fragments(sender, instance, **kwargs):
+    bump_version('group', instance.pk)
+
+
+@receiver(post_save, sender=User)
+def expire_author_fragments(sender, instance, update_fields, **kwargs):
+    # При входе сохраняется только last_login — карточки не меняются.
+    if touches_author_display(update_fields):
+        bump_version('author', instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def expire_post_pages(sender, instance, **kwargs):
+    origin = getattr(instance, '_origin', None) or (None, None)
+    authors = {instance.author_id, origin[0]} - {None}
+    groups = {instance.group_id, origin[1]} - {None}
+    page_cache.expire(
+        'feed',
+        f'post:{instance.pk}',
+        *(f'author:{pk}' for pk in authors),
+        *(f'group:{pk}' for pk in groups),
+    )
+    page_cache.forget('post', instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def expire_group_pages(sender, instance, created=False, **kwargs):
+    page_cache.forget('group', instance.slug)
+    # Название группы видно на главной и в профилях её авторов.
+    authors = [] if created else Post.objects.filter(
+        group=instance
+    ).order_by().values_list('author_id', flat=True).distinct()
+    page_cache.expire(
+        'feed',
+        f'group:{instance.pk}',
+        *(f'author:{pk}' for pk in authors),
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def expire_author_pages(sender, instance, created=False, update_fields=None,
+                        **kwargs):
+    if not touches_author_display(update_fields):
+        return
+    # Имя могло освободиться и достаться новому пользователю.
+    page_cache.forget('author', instance.username)
+    if created:
+        return
+    # Имя автора видно на главной и в лентах групп с его постами.
+    groups = Post.objects.filter(
+        author=instance, group__isnull=False
+    ).order_by().values_list('group_id', flat=True).distinct()
+    page_cache.expire(
+        'feed',
+        f'author:{instance.pk}',
+        *(f'group:{pk}' for pk in groups),
+    )
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..counters import rebuild_counters
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='api', first_name='Иван', last_name='Бунин'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='api-group', description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}', group=cls.group)
+            for i in range(15)
+        )
+        rebuild_counters()
+        cls.posts = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_feed_walks_with_cursor(self):
+        """Лента отдаётся страницами по курсору в порядке ленты."""
+        url = reverse('posts:api_post_list')
+        response = self.guest_client.get(url, {'limit': 10})
+        first = response.json()
+        self.assertEqual(len(first['results']), 10)
+        self.assertIsNone(first['previous'])
+        second = self.guest_client.get(
+            url, {'limit': 10, 'cursor': first['next']}
+        ).json()
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(ids, [post.pk for post in self.posts])
+        self.assertIsNone(second['next'])
+
+    def test_sparse_fields(self):
+        response = self.guest_client.get(
+            reverse('posts:api_group_posts', args=[self.group.slug]),
+            {'fields': 'text,author'}
+        )
+        row = response.json()['results'][0]
+        self.assertEqual(row, {'text': self.posts[0].text, 'author': 'api'})
+
+    def test_feed_is_one_query(self):
+        """Лента читается одним запросом, без объектов моделей."""
+        with self.assertNumQueries(1):
+            self.guest_client.get(reverse('posts:api_post_list'))
+
+    def test_unknown_field_is_bad_request(self):
+        response = self.guest_client.get(
+            reverse('posts:api_post_list'), {'fields': 'id,password'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_detail_endpoints(self):
+        post = self.posts[0]
+        data = self.guest_client.get(
+            reverse('posts:api_post_detail', args=[post.pk])
+        ).json()
+        self.assertEqual(data['group'], self.group.slug)
+        data = self.guest_client.get(
+            reverse('posts:api_author', args=[self.user.username])
+        ).json()
+        self.assertEqual(data['posts_count'], 15)
+        self.assertEqual(data['first_name'], 'Иван')
+        data = self.guest_client.get(
+            reverse('posts:api_group', args=[self.group.slug])
+        ).json()
+        self.assertEqual(data['title'], self.group.title)
+        response = self.guest_client.get(
+            reverse('posts:api_author_posts', args=['nobody'])
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_not_found_is_json(self):
+        for url in (reverse('posts:api_post_detail', args=[10**6]),
+                    reverse('posts:api_group', args=['nothing'])):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertEqual(response.json(), {'detail': 'Не найдено'})
@@ -0,0 +1,94 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..benchmarks import check_budgets, compare_with_baseline
+from ..management.commands.bench_views import DEFAULT_BUDGETS
+
+RESULT = {'p50_ms': 10, 'p95_ms': 20, 'queries': 4, 'bytes': 1000}
+
+
+class BudgetTests(TestCase):
+    def test_budget_violation(self):
+        """Превышение любой метрики бюджета попадает в отчёт."""
+        results = {'100': {'index': RESULT}}
+        self.assertEqual(
+            check_budgets(results, {'index': {'queries': 4}}), []
+        )
+        self.assertEqual(
+            len(check_budgets(results, {'index': {'queries': 3}})), 1
+        )
+
+    def test_baseline_tolerance(self):
+        """Время сравнивается с допуском, число запросов — точно."""
+        baseline = {'100': {'index': RESULT}}
+        slower = dict(RESULT, p95_ms=22)
+        self.assertEqual(
+            compare_with_baseline({'100': {'index': slower}}, baseline, 0.2),
+            []
+        )
+        more_queries = dict(RESULT, queries=5)
+        self.assertEqual(len(compare_with_baseline(
+            {'100': {'index': more_queries}}, baseline, 0.2
+        )), 1)
+
+
+class BenchViewsCommandTests(TestCase):
+    def run_command(self, budgets=None, **options):
+        options = {'sizes': '30', 'users': 3, 'groups': 2, 'repeat': 1,
+                   **options}
+        with tempfile.TemporaryDirectory() as directory:
+            budgets_path = os.path.join(directory, 'budgets.json')
+            output_path = os.path.join(directory, 'results.json')
+            if budgets is None:
+                budgets_path = DEFAULT_BUDGETS
+            else:
+                with open(budgets_path, 'w') as budgets_file:
+                    json.dump(budgets, budgets_file)
+            try:
+                call_command(
+                    'bench_views', budgets=budgets_path, output=output_path,
+                    stdout=io.StringIO(), stderr=io.StringIO(), **options
+                )
+            finally:
+                with open(output_path) as output:
+                    self.report = json.load(output)
+
+    def test_writes_results(self):
+        """Результаты пишутся в JSON по размерам и представлениям."""
+        self.run_command({})
+        views = self.report['results']['30']
+        self.assertEqual(views['index']['status'], 200)
+        self.assertEqual(views['post_create:post']['status'], 302)
+        self.assertGreater(views['profile']['bytes'], 0)
+
+    def test_fails_on_budget(self):
+        """Нарушенный бюджет завершает команду ошибкой."""
+        with self.assertRaises(CommandError):
+            self.run_command({'index': {'queries': 0}})
+
+    def test_shipped_budgets_hold(self):
+        """Бюджеты из bench_budgets.json соблюдаются."""
+        self.run_command(sizes='200,500', users=20, groups=5, repeat=3)
+
+    def test_site_cache_is_not_cleared(self):
+        """Замер сбрасывает только свой кэш, а не кэш сайта."""
+        cache.set('bench:canary', 1)
+        self.run_command({})
+        self.assertEqual(cache.get('bench:canary'), 1)
+
+
+class BenchArticlesCommandTests(TestCase):
+    def test_compares_with_include_loop(self):
+        """Замер сравнивает include в цикле с article_cards."""
+        cache.set('bench:canary', 1)
+        output = io.StringIO()
+        call_command('bench_articles', posts=3, repeat=2, stdout=output)
+        for mode in ('include в цикле', 'холодный', 'тёплый'):
+            self.assertIn(mode, output.getvalue())
+        self.assertEqual(cache.get('bench:canary'), 1)
@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='etag')
+        cls.group = Group.objects.create(
+            title='Группа', slug='etag-group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Пост', group=cls.group
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.user.username]),
+            reverse('posts:post_detail', args=[cls.post.pk]),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def revalidate(self, url, response):
+        return self.guest_client.get(
+            url,
+            HTTP_IF_NONE_MATCH=response['ETag'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+
+    def test_unchanged_page_returns_not_modified(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    again = self.revalidate(url, response)
+                self.assertEqual(again.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_edit_moves_validators(self):
+        """Правка поста меняет валидаторы всех его страниц."""
+        responses = {url: self.guest_client.get(url) for url in self.urls}
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertGreater(post.updated, post.pub_date)
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                again = self.revalidate(url, response)
+                self.assertEqual(again.status_code, HTTPStatus.OK)
+
+    def test_delete_changes_etag(self):
+        url = reverse('posts:index')
+        extra = Post.objects.create(author=self.user, text='Лишний пост')
+        Post.objects.filter(pk=self.post.pk).update(updated=extra.updated)
+        response = self.guest_client.get(url)
+        Post.objects.filter(pk=extra.pk).delete()
+        again = self.guest_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, HTTPStatus.OK)
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from ..bulk import sync_after_bulk
+from ..counters import find_counter_mismatches
+from ..models import AuthorStats, Follow, Group, Post
+
+User = get_user_model()
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='counter')
+        cls.user2 = User.objects.create_user(username='counter2')
+        cls.group = Group.objects.create(
+            title='Группа', slug='counter-group', description='Описание'
+        )
+        cls.group2 = Group.objects.create(
+            title='Группа 2', slug='counter-group-2', description='Описание'
+        )
+
+    def assertCounts(self, author, group, author2=0, group2=0):
+        self.group.refresh_from_db()
+        self.group2.refresh_from_db()
+        self.assertEqual(AuthorStats.objects.get(author=self.user).posts_count,
+                         author)
+        self.assertEqual(self.group.posts_count, group)
+        self.assertEqual(
+            AuthorStats.objects.filter(
+                author=self.user2
+            ).values_list('posts_count', flat=True).first() or 0,
+            author2
+        )
+        self.assertEqual(self.group2.posts_count, group2)
+
+    def test_counters_follow_create_move_and_delete(self):
+        """Счётчики меняются при создании, переносе и удалении поста."""
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.group
+        )
+        Post.objects.create(author=self.user, text='Пост без группы')
+        self.assertCounts(author=2, group=1)
+        post.group = self.group2
+        post.author = self.user2
+        post.save()
+        self.assertCounts(author=1, group=0, author2=1, group2=1)
+        post.delete()
+        self.assertCounts(author=1, group=0)
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_pages_read_stored_counter(self):
+        """Страницы автора и поста не считают посты заново."""
+        post = Post.objects.create(author=self.user, text='Пост')
+        AuthorStats.objects.filter(author=self.user).update(posts_count=42)
+        client = Client()
+        for url in (
+            reverse('posts:profile', kwargs={'username': self.user.username}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        ):
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(response.context['author_posts'], 42)
+
+    def test_command_rebuilds_and_checks(self):
+        Post.objects.create(author=self.user, text='Пост', group=self.group)
+        Group.objects.filter(pk=self.group.pk).update(posts_count=7)
+        with self.assertRaises(CommandError):
+            call_command('post_counters', check=True, stdout=StringIO())
+        call_command('post_counters', stdout=StringIO())
+        call_command('post_counters', check=True, stdout=StringIO())
+        self.assertCounts(author=1, group=1)
+
+    def test_deleting_author_with_posts_and_followers(self):
+        """Удаление автора с постами и подписчиками не ломает счётчики."""
+        author = User.objects.create_user(username='leaving')
+        for number in range(3):
+            Post.objects.create(
+                author=author, text=f'Пост {number}', group=self.group
+            )
+        Follow.objects.create(user=self.user, author=author)
+        Follow.objects.create(user=self.user2, author=author)
+        Follow.objects.create(user=author, author=self.user)
+        author.delete()
+        self.assertFalse(AuthorStats.objects.filter(author_id=author.pk)
+                         .exists())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_recount_touches_only_given_authors_and_groups(self):
+        """Массовый путь пересчитывает только затронутые счётчики."""
+        Post.objects.bulk_create([
+            Post(author=self.user, text='Первый', group=self.group),
+            Post(author=self.user2, text='Второй', group=self.group2),
+        ])
+        sync_after_bulk([self.user.pk], [self.group.pk])
+        self.assertCounts(1, 1)
+        self.assertEqual(
+            sorted(kind for kind, _, _, _ in find_counter_mismatches()),
+            ['author', 'group']
+        )
+
+    def test_bulk_create_keeps_pub_date_per_call(self):
+        """keep_pub_date не меняет поле модели для других вставок."""
+        moment = timezone.now() - timedelta(days=30)
+        Post.objects.bulk_create(
+            [Post(author=self.user, text='Старый', pub_date=moment)],
+            keep_pub_date=True,
+        )
+        Post.objects.bulk_create(
+            [Post(author=self.user, text='Новый', pub_date=moment)]
+        )
+        self.assertEqual(Post.objects.get(text='Старый').pub_date, moment)
+        self.assertGreater(Post.objects.get(text='Новый').pub_date, moment)
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
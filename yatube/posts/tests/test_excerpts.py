@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import EXCERPT_WORDS, Group, Post
+
+User = get_user_model()
+
+LONG_TEXT = ' '.join(f'слово{i}' for i in range(EXCERPT_WORDS + 10))
+
+
+class ExcerptTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='longread')
+        self.group = Group.objects.create(
+            title='Группа', slug='longread', description='Описание'
+        )
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text=LONG_TEXT
+        )
+        self.guest_client = Client()
+
+    def test_excerpt_is_stored_on_save(self):
+        self.assertEqual(self.post.word_count, EXCERPT_WORDS + 10)
+        self.assertTrue(self.post.is_truncated)
+        self.assertEqual(len(self.post.excerpt.split()), EXCERPT_WORDS)
+        self.post.text = 'Короткий текст'
+        self.post.save(update_fields=['text'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.excerpt, 'Короткий текст')
+        self.assertEqual(self.post.word_count, 2)
+
+    def test_bulk_create_fills_excerpt(self):
+        Post.objects.bulk_create([Post(author=self.user, text='Раз два')])
+        post = Post.objects.get(text='Раз два')
+        self.assertEqual((post.excerpt, post.word_count), ('Раз два', 2))
+
+    def test_feeds_do_not_read_full_text(self):
+        """Ленты не выбирают текст и ведут к посту ссылкой."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+        )
+        detail = reverse('posts:post_detail', args=[self.post.pk])
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.guest_client.get(url)
+                for query in queries.captured_queries:
+                    self.assertNotIn('"posts_post"."text"', query['sql'])
+                self.assertNotContains(response, 'слово55')
+                self.assertContains(response, 'Читать дальше')
+                self.assertContains(response, f'href="{detail}"')
+        self.assertContains(self.guest_client.get(detail), 'слово55')
@@ -0,0 +1,147 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..export import export_lines, filter_posts
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Группа', slug='export-group', description='Описание'
+        )
+        now = timezone.now()
+        Post.objects.bulk_create(
+            (
+                Post(
+                    author=cls.author if i % 2 else cls.other,
+                    group=cls.group if i % 3 else None,
+                    text=f'Пост {i}, "с кавычками"',
+                    pub_date=now - timedelta(days=i),
+                )
+                for i in range(7)
+            ),
+            keep_pub_date=True,
+        )
+
+    def setUp(self):
+        cache.clear()
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.guest_client = Client()
+        self.staff_client = Client()
+        self.staff_client.force_login(staff)
+
+    def read_jsonl(self, response):
+        body = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_streams_jsonl_with_filters(self):
+        """Выгрузка потоковая и учитывает автора и группу."""
+        response = self.staff_client.get(
+            reverse('posts:api_export'),
+            {'author': 'writer', 'group': 'export-group'},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        rows = self.read_jsonl(response)
+        expected = Post.objects.filter(
+            author=self.author, group=self.group
+        ).order_by('pk')
+        self.assertEqual(
+            [row['id'] for row in rows], [post.pk for post in expected]
+        )
+        self.assertEqual(rows[0]['author'], 'writer')
+        self.assertEqual(rows[0]['group'], 'export-group')
+
+    def test_chunks_cover_every_post_once(self):
+        """Пачки по первичному ключу не теряют и не повторяют строк."""
+        lines = list(export_lines(Post.objects.all(), 'jsonl', chunk_size=2))
+        ids = [json.loads(line)['id'] for line in lines]
+        self.assertEqual(
+            ids, list(Post.objects.order_by('pk').values_list('pk', flat=True))
+        )
+
+    def test_date_range(self):
+        """since включает границу, until — нет."""
+        day = (timezone.localdate() - timedelta(days=3)).isoformat()
+        posts = filter_posts(since=day)
+        self.assertTrue(all(
+            timezone.localtime(post.pub_date).date().isoformat() >= day
+            for post in posts
+        ))
+        self.assertFalse(filter_posts(until=day).filter(
+            pk__in=posts.values('pk')
+        ).exists())
+
+    def test_csv(self):
+        """CSV начинается с заголовка и корректно экранирует текст."""
+        response = self.staff_client.get(
+            reverse('posts:api_export'), {'format': 'csv'}
+        )
+        body = b''.join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(
+            rows[0], ['id', 'pub_date', 'updated', 'author', 'group', 'text']
+        )
+        self.assertEqual(len(rows), Post.objects.count() + 1)
+        self.assertIn('"с кавычками"', rows[1][-1])
+
+    def test_bad_parameters(self):
+        """Неизвестный формат и кривая дата дают 400."""
+        url = reverse('posts:api_export')
+        for params in ({'format': 'xml'}, {'since': 'вчера'}):
+            with self.subTest(params=params):
+                response = self.staff_client.get(url, params)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    @override_settings(EXPORT_TOKEN='secret', EXPORT_RATE_LIMIT=2)
+    def test_access_and_rate_limit(self):
+        """Выгрузка — только персоналу и по токену, не чаще предела."""
+        url = reverse('posts:api_export')
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(self.guest_client.get(
+            url, HTTP_AUTHORIZATION='Bearer wrong'
+        ).status_code, HTTPStatus.NOT_FOUND)
+        for _ in range(2):
+            self.assertEqual(self.guest_client.get(
+                url, HTTP_AUTHORIZATION='Bearer secret'
+            ).status_code, HTTPStatus.OK)
+        self.assertEqual(self.guest_client.get(
+            url, HTTP_AUTHORIZATION='Bearer secret'
+        ).status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(
+            self.staff_client.get(url).status_code, HTTPStatus.OK
+        )
+
+    def test_command_writes_file(self):
+        """Команда export_posts пишет выгрузку в файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'posts.jsonl')
+            call_command(
+                'export_posts', output=path, author='other',
+                stderr=io.StringIO()
+            )
+            with open(path, encoding='utf-8') as output:
+                rows = [json.loads(line) for line in output]
+        self.assertEqual(
+            len(rows), Post.objects.filter(author=self.other).count()
+        )
@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import feed
+from ..models import FeedEntry, Group, Post
+
+User = get_user_model()
+
+
+class FeedEntryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='feeder', first_name='Лев', last_name='Толстой'
+        )
+        self.group = Group.objects.create(
+            title='Группа', slug='feed-group', description='Описание'
+        )
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Пост'
+        )
+        self.guest_client = Client()
+
+    def entry(self):
+        return FeedEntry.objects.get(pk=self.post.pk)
+
+    def test_entry_follows_post(self):
+        """Строка ленты создаётся, меняется и удаляется вместе с постом."""
+        entry = self.entry()
+        self.assertEqual(entry.author_name, 'Лев Толстой')
+        self.assertEqual(entry.group_slug, 'feed-group')
+        self.post.text = 'слово ' * 100
+        self.post.group = None
+        self.post.save()
+        entry = self.entry()
+        self.assertEqual(entry.excerpt, self.post.excerpt)
+        self.assertEqual(entry.word_count, 100)
+        self.assertEqual(entry.group_title, '')
+        self.post.delete()
+        self.assertFalse(FeedEntry.objects.exists())
+
+    def test_renames_reach_entries(self):
+        self.user.first_name = 'Алексей'
+        self.user.save()
+        self.group.title = 'Новая группа'
+        self.group.save()
+        entry = self.entry()
+        self.assertEqual(entry.author_name, 'Алексей Толстой')
+        self.assertEqual(entry.group_title, 'Новая группа')
+        self.group.delete()
+        self.assertIsNone(self.entry().group_id)
+        self.assertEqual(feed.find_mismatches(), [])
+
+    def test_index_reads_feed_without_joins(self):
+        """Главная читает строки ленты одним запросом без JOIN."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(reverse('posts:index'))
+        feed_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'posts_feedentry' in query['sql']
+        ]
+        self.assertTrue(feed_queries)
+        for sql in feed_queries:
+            self.assertNotIn('JOIN', sql)
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertContains(response, 'Лев Толстой')
+        self.assertContains(
+            response, reverse('posts:group_list', args=['feed-group'])
+        )
+
+    def test_bulk_create_and_command(self):
+        """bulk_create сам добавляет строки ленты, видные на главной."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {i}') for i in range(3)
+        )
+        self.assertEqual(feed.find_mismatches(), [])
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), 4)
+        FeedEntry.objects.filter(pk__in=Post.objects.filter(
+            text__startswith='Пост '
+        ).values('pk')).delete()
+        self.assertEqual(
+            [kind for kind, _ in feed.find_mismatches()], ['missing'] * 3
+        )
+        FeedEntry.objects.filter(pk=self.post.pk).update(excerpt='старое')
+        with self.assertRaises(CommandError):
+            call_command('feed_entries', '--check', stdout=StringIO())
+        call_command('feed_entries', stdout=StringIO())
+        self.assertEqual(self.entry().excerpt, 'Пост')
+        self.assertEqual(FeedEntry.objects.count(), 4)
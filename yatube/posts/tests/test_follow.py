@@ -0,0 +1,174 @@
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..counters import find_counter_mismatches
+from ..models import FanoutTask, Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class FollowTimelineTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer')
+        self.reader = User.objects.create_user(username='reader')
+        self.stranger = User.objects.create_user(username='stranger')
+        self.old_post = Post.objects.create(
+            author=self.author, text='Старый пост'
+        )
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def follow(self, client=None, username='writer'):
+        return (client or self.reader_client).post(
+            reverse('posts:profile_follow', args=[username])
+        )
+
+    def timeline(self, client=None, **params):
+        response = (client or self.reader_client).get(
+            reverse('posts:follow_index'), params
+        )
+        return response.context['page_obj']
+
+    def fanout(self):
+        call_command('fanout_timelines', stdout=io.StringIO())
+
+    def test_follow_backfills_timeline(self):
+        """Подписка кладёт в ленту последние посты автора."""
+        self.follow()
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+            .exists()
+        )
+        self.assertEqual(self.author.stats.followers_count, 1)
+        self.assertEqual(list(self.timeline()), [self.old_post])
+
+    def test_new_post_is_visible_before_and_after_fanout(self):
+        """Новый пост виден сразу, а после fan-out — из ленты, один раз."""
+        self.follow()
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertTrue(FanoutTask.objects.filter(post=post).exists())
+        self.assertEqual(list(self.timeline()), [post, self.old_post])
+        self.fanout()
+        self.assertFalse(FanoutTask.objects.exists())
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(list(self.timeline()), [post, self.old_post])
+
+    def test_timeline_is_personal(self):
+        """Посты попадают только в ленты подписчиков."""
+        self.follow()
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.fanout()
+        stranger_client = Client()
+        stranger_client.force_login(self.stranger)
+        self.assertEqual(list(self.timeline(stranger_client)), [])
+
+    def test_unfollow_clears_timeline(self):
+        self.follow()
+        self.reader_client.post(
+            reverse('posts:profile_unfollow', args=['writer'])
+        )
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(list(self.timeline()), [])
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_cannot_follow_self(self):
+        self.follow(username='reader')
+        self.assertFalse(Follow.objects.exists())
+
+    def test_follow_requires_post(self):
+        response = self.reader_client.get(
+            reverse('posts:profile_follow', args=['writer'])
+        )
+        self.assertEqual(response.status_code, 405)
+
+    @mock.patch('posts.timeline.FANOUT_LIMIT', 0)
+    def test_popular_author_is_pulled_on_read(self):
+        """Посты популярного автора не раскладываются, а читаются."""
+        self.follow()
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.fanout()
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(list(self.timeline()), [post, self.old_post])
+
+    def test_cursor_walks_merged_sources(self):
+        """Страницы из разложенных и читаемых постов не теряют постов."""
+        popular = User.objects.create_user(username='popular')
+        self.follow()
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {i}')
+            for i in range(12) for author in (self.author, popular)
+        )
+        self.follow(username='popular')
+        expected = list(Post.objects.filter(
+            author__in=[self.author, popular]
+        ).values_list('pk', flat=True))
+        with mock.patch('posts.timeline.FANOUT_LIMIT', 0):
+            # у popular один подписчик — больше нуля, его посты читаются
+            seen = []
+            page = self.timeline()
+            seen += [post.pk for post in page]
+            while page.has_next():
+                page = self.timeline(cursor=page.next_cursor)
+                seen += [post.pk for post in page]
+        self.assertEqual(seen, expected)
+
+    def test_bulk_create_queues_fanout(self):
+        """Посты, вставленные пачкой, тоже раскладываются по лентам."""
+        self.follow()
+        self.fanout()
+        Post.objects.bulk_create(
+            Post(author=self.author, text=f'Пост {i}') for i in range(3)
+        )
+        self.assertEqual(
+            set(FanoutTask.objects.values_list('post_id', flat=True)),
+            set(Post.objects.exclude(pk=self.old_post.pk).values_list(
+                'pk', flat=True
+            ))
+        )
+        self.fanout()
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 4
+        )
+
+    def test_switch_from_pull_to_push_backfills(self):
+        """Автор, снова раскладываемый при записи, не пропадает из лент."""
+        self.follow()
+        stranger_client = Client()
+        stranger_client.force_login(self.stranger)
+        with mock.patch('posts.timeline.FANOUT_LIMIT', 1):
+            self.follow(stranger_client)
+            post = Post.objects.create(author=self.author, text='Новый пост')
+            self.fanout()
+            self.assertFalse(
+                TimelineEntry.objects.filter(post=post).exists()
+            )
+            stranger_client.post(
+                reverse('posts:profile_unfollow', args=['writer'])
+            )
+            self.assertEqual(list(self.timeline()), [post, self.old_post])
+            self.fanout()
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(user=self.reader).values_list(
+                'post_id', flat=True
+            )),
+            {post.pk, self.old_post.pk}
+        )
+        self.assertEqual(list(self.timeline()), [post, self.old_post])
+
+    def test_follow_button_is_personal(self):
+        """Профиль общий, а кнопка подписки зависит от пользователя."""
+        url = reverse('posts:profile', args=['writer'])
+        self.assertNotContains(Client().get(url), 'Подписаться')
+        self.assertContains(self.reader_client.get(url), 'Подписаться')
+        self.follow()
+        self.assertContains(self.reader_client.get(url), 'Отписаться')
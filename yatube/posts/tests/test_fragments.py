@@ -0,0 +1,160 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template.defaultfilters import date
+from django.template.loader import render_to_string
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from core import metrics
+
+from .. import fragments
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ArticleFragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='fragment', first_name='Анна', last_name='Каренина'
+        )
+        cls.group = Group.objects.create(
+            title='Поезда', slug='trains', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Исходный текст', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get_index(self):
+        # Рендерим ленту без кэша целых страниц.
+        return render_to_string('posts/index.html', {
+            'page_obj': Post.objects.for_feed(),
+        })
+
+    def test_cached_card_matches_fresh_one(self):
+        """Карточка из кэша совпадает с только что отрисованной."""
+        posts = [Post.objects.get(pk=self.post.pk)]
+        fresh = fragments.render_articles(posts)
+        self.assertEqual(fragments.render_articles(posts), fresh)
+        self.assertEqual(
+            fresh, [fragments.ArticleRenderer().render(posts[0], last=True)]
+        )
+
+    def test_second_render_hits_cache(self):
+        before = fragments.get_stats()
+        self.get_index()
+        self.get_index()
+        after = fragments.get_stats()
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 1)
+
+    def test_stats_are_exported_as_metrics(self):
+        """Попадания и промахи видны на /metrics."""
+        self.get_index()
+        self.get_index()
+        text = metrics.render()
+        for result in ('hit', 'miss'):
+            self.assertIn(
+                f'yatube_fragment_cache_total{{result="{result}"}}', text
+            )
+
+    def test_fragment_expires_on_changes(self):
+        """Правка поста, группы и имени автора обновляет карточку."""
+        self.get_index()
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertIn('Новый текст', self.get_index())
+        self.group.title = 'Пароходы'
+        self.group.save()
+        self.assertIn('Пароходы', self.get_index())
+        self.user.first_name = 'Долли'
+        self.user.save()
+        self.assertIn('Долли', self.get_index())
+
+    def test_login_does_not_expire_fragment(self):
+        self.get_index()
+        key = fragments.version_key('author', self.user.pk)
+        version = cache.get(key)
+        Client().force_login(self.user)
+        self.assertEqual(cache.get(key), version)
+
+
+class ArticleListTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='batch', first_name='Том & <Джерри>', last_name='"Кот"'
+        )
+        cls.group = Group.objects.create(
+            title='<Группа> & "Ко"', slug='batch-group', description=''
+        )
+        Post.objects.create(author=cls.user, text='Без группы <b>')
+        Post.objects.create(author=cls.user, text='слово ' * 80,
+                            group=cls.group)
+        Post.objects.create(author=cls.user, text='С группой', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cards(self):
+        """Карточки строятся по article.html с готовыми адресами."""
+        posts = list(Post.objects.for_feed().order_by('pk'))
+        cards = fragments.render_articles(posts)
+        detail = reverse('posts:post_detail', args=[posts[1].pk])
+        group = reverse('posts:group_list', args=['batch-group'])
+        self.assertIn('Автор: Том &amp; &lt;Джерри&gt; &quot;Кот&quot;',
+                      cards[0])
+        self.assertIn('Без группы &lt;b&gt;', cards[0])
+        self.assertNotIn('Группа: ', cards[0])
+        self.assertIn(
+            f'<a href="{group}">&lt;Группа&gt; &amp; &quot;Ко&quot;</a>',
+            cards[1]
+        )
+        self.assertIn(f'<a href="{detail}">Читать дальше</a>', cards[1])
+        self.assertNotIn('Читать дальше', cards[2])
+        self.assertEqual([('<hr>' in card) for card in cards],
+                         [True, True, False])
+
+    def test_date_is_formatted_once_per_day(self):
+        posts = list(Post.objects.for_feed())
+        renderer = fragments.ArticleRenderer()
+        card = renderer.render(posts[0])
+        self.assertIn(
+            f'Дата публикации: {date(posts[0].pub_date, "d E Y")}', card
+        )
+        for post in posts:
+            renderer.render(post)
+        self.assertEqual(len(renderer.dates), 1)
+
+    def test_without_group_links(self):
+        posts = list(Post.objects.for_feed())
+        cards = fragments.render_articles(posts, without_group_links=True)
+        self.assertFalse(any('Группа: ' in card for card in cards))
+
+    def test_second_page_render_hits_cache(self):
+        posts = list(Post.objects.for_feed())
+        before = fragments.get_stats()
+        fragments.render_articles(posts)
+        fragments.render_articles(posts)
+        after = fragments.get_stats()
+        self.assertEqual(after['misses'] - before['misses'], 3)
+        self.assertEqual(after['hits'] - before['hits'], 3)
+
+    @override_settings(FRAGMENT_CACHE_TIMEOUT=0)
+    def test_timeout_comes_from_settings(self):
+        posts = list(Post.objects.for_feed())
+        before = fragments.get_stats()
+        fragments.render_articles(posts)
+        fragments.render_articles(posts)
+        self.assertEqual(fragments.get_stats()['misses'] - before['misses'],
+                         6)
+
+    def test_empty_page(self):
+        self.assertEqual(fragments.render_articles([]), [])
@@ -0,0 +1,98 @@
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..counters import find_counter_mismatches
+from ..models import Group, ImportOffset, Post
+
+User = get_user_model()
+
+
+class ImportPostsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        User.objects.create_user(username='known')
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8', newline='') as source:
+            source.write(content)
+        return path
+
+    def import_posts(self, path, **options):
+        call_command('import_posts', path, stdout=io.StringIO(), **options)
+
+    def test_jsonl_creates_missing_authors_and_groups(self):
+        """Авторы и группы находятся по имени, недостающие создаются."""
+        rows = [
+            {'author': 'known', 'text': 'Первый', 'group': 'news',
+             'group_title': 'Новости', 'pub_date': '2020-01-02T10:00:00'},
+            {'author': 'new', 'text': 'Второй', 'group': 'news'},
+            {'author': 'new', 'text': 'Третий'},
+        ]
+        path = self.write(
+            'posts.jsonl', ''.join(json.dumps(row) + '\n' for row in rows)
+        )
+        self.import_posts(path, batch_size=2)
+        self.assertEqual(Post.objects.count(), 3)
+        self.assertEqual(User.objects.filter(username='known').count(), 1)
+        new_author = User.objects.get(username='new')
+        self.assertFalse(new_author.has_usable_password())
+        group = Group.objects.get(slug='news')
+        self.assertEqual(group.title, 'Новости')
+        self.assertEqual(
+            Post.objects.get(text='Первый').pub_date.year, 2020
+        )
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_csv(self):
+        """CSV в формате выгрузки загружается так же, как JSONL."""
+        path = self.write(
+            'posts.csv',
+            'author,group,text\nknown,,"Пост, с запятой"\nknown,csv,Ещё\n'
+        )
+        self.import_posts(path)
+        self.assertTrue(Post.objects.filter(text='Пост, с запятой').exists())
+        self.assertTrue(Group.objects.filter(slug='csv').exists())
+
+    def test_resumes_after_failure(self):
+        """Повторный запуск продолжает после последней пачки."""
+        lines = [json.dumps({'author': 'known', 'text': f'Пост {i}'})
+                 for i in range(4)]
+        lines.insert(3, json.dumps({'author': 'known'}))
+        path = self.write('posts.jsonl', '\n'.join(lines) + '\n')
+        with self.assertRaises(CommandError):
+            self.import_posts(path, batch_size=2)
+        # Первая пачка записана, вторая (с плохой строкой) откатилась.
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(
+            ImportOffset.objects.get(source=os.path.abspath(path)).offset, 2
+        )
+        # Записанные строки при продолжении не разбираются.
+        lines[0] = 'не JSON'
+        lines[3] = json.dumps({'author': 'known', 'text': 'Исправлено'})
+        self.write('posts.jsonl', '\n'.join(lines) + '\n')
+        self.import_posts(path, batch_size=2)
+        self.assertEqual(
+            sorted(Post.objects.values_list('text', flat=True)),
+            ['Исправлено', 'Пост 0', 'Пост 1', 'Пост 2', 'Пост 3']
+        )
+
+    def test_offset_is_saved_with_the_batch(self):
+        """Номер строки пишется в транзакции пачки и сбрасывается --restart."""
+        path = self.write(
+            'posts.csv', 'author,text\nknown,"Первая\nстрока"\n\nknown,Ещё\n'
+        )
+        self.import_posts(path, batch_size=1)
+        self.assertEqual(ImportOffset.objects.get().offset, 2)
+        self.import_posts(path)
+        self.assertEqual(Post.objects.count(), 2)
+        self.import_posts(path, restart=True)
+        self.assertEqual(Post.objects.count(), 4)
+        self.assertEqual(ImportOffset.objects.get().offset, 2)
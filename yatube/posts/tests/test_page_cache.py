@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='pager')
+        cls.group = Group.objects.create(
+            title='Группа', slug='pager-group', description='Описание'
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа', slug='pager-other', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Первый пост', group=cls.group
+        )
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', args=[cls.group.slug]),
+            'other': reverse('posts:group_list', args=[cls.other_group.slug]),
+            'profile': reverse('posts:profile', args=[cls.user.username]),
+            'detail': reverse('posts:post_detail', args=[cls.post.pk]),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def assertCached(self, url):
+        with self.assertNumQueries(0):
+            self.guest_client.get(url)
+
+    def test_anonymous_pages_are_cached(self):
+        for url in self.urls.values():
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(url)
+                self.assertEqual(first.content, second.content)
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_timeout_comes_from_settings(self):
+        """Срок хранения страниц берётся из PAGE_CACHE_TIMEOUT."""
+        self.guest_client.get(self.urls['index'])
+        response = self.guest_client.get(self.urls['index'])
+        self.assertIsNotNone(response.context)
+
+    def test_new_post_expires_only_related_pages(self):
+        """Новый пост сбрасывает свои ленты и не трогает чужую группу."""
+        for url in self.urls.values():
+            self.guest_client.get(url)
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            {'text': 'Свежий пост', 'group': self.group.pk},
+        )
+        for name in ('index', 'group', 'profile', 'detail'):
+            with self.subTest(page=name):
+                response = self.guest_client.get(self.urls[name])
+                self.assertIsNotNone(response.context)
+        self.assertCached(self.urls['other'])
+
+    def test_edit_expires_post_detail(self):
+        self.guest_client.get(self.urls['detail'])
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=[self.post.pk]),
+            {'text': 'Исправленный пост', 'group': self.group.pk},
+        )
+        response = self.guest_client.get(self.urls['detail'])
+        self.assertContains(response, 'Исправленный пост')
+
+    def test_cached_page_gets_personal_header(self):
+        """Общая страница из кэша получает шапку своего пользователя."""
+        self.guest_client.get(self.urls['index'])
+        response = self.authorized_client.get(self.urls['index'])
+        self.assertContains(response, f'Пользователь: {self.user.username}')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        response = self.guest_client.get(self.urls['index'])
+        self.assertNotContains(response, 'Пользователь:')
+        self.assertContains(response, 'Войти')
+
+    def test_etag_covers_personal_header(self):
+        """ETag собранной страницы меняется вместе с шапкой."""
+        url = self.urls['index']
+        guest = self.guest_client.get(url)
+        again = self.guest_client.get(url, HTTP_IF_NONE_MATCH=guest['ETag'])
+        self.assertEqual(again.status_code, 304)
+        authorized = self.authorized_client.get(
+            url, HTTP_IF_NONE_MATCH=guest['ETag']
+        )
+        self.assertEqual(authorized.status_code, 200)
+        self.assertNotEqual(authorized['ETag'], guest['ETag'])
+
+    @override_settings(EDGE_INCLUDES=False)
+    def test_page_without_edge_is_shared(self):
+        response = self.authorized_client.get(self.urls['index'])
+        self.assertNotContains(response, 'Пользователь:')
+        self.assertContains(response, '<!--# include virtual="/auth/header/')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertFalse(response.has_header('Vary'))
@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..bulk import sync_after_bulk
+from ..models import Post
+from ..paginators import CursorPaginator, EstimatedPaginator
+
+User = get_user_model()
+
+POSTS_TOTAL = 23
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='cursor')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Текст{i}') for i in range(POSTS_TOTAL)
+        )
+        # Часть постов получает одинаковую дату, чтобы проверить
+        # упорядочивание по id внутри одной даты.
+        now = timezone.now()
+        for i, post in enumerate(Post.objects.order_by('pk')):
+            post.pub_date = now - timedelta(minutes=i // 3)
+            post.save(update_fields=['pub_date'])
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def walk(self, per_page):
+        paginator = CursorPaginator(Post.objects.all(), per_page)
+        pages = [paginator.get_page(None)]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_forward_walk_matches_ordering(self):
+        """Проход вперёд по курсорам повторяет порядок ленты."""
+        _, pages = self.walk(10)
+        walked = [post.pk for page in pages for post in page]
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        )
+        self.assertEqual(walked, expected)
+        self.assertEqual([len(page) for page in pages], [10, 10, 3])
+        self.assertFalse(pages[0].has_previous())
+
+    def test_backward_walk_returns_same_pages(self):
+        """Курсор «назад» возвращает предыдущую страницу целиком."""
+        paginator, pages = self.walk(10)
+        back = paginator.get_page(pages[2].previous_cursor)
+        self.assertEqual(list(back), list(pages[1]))
+        first = paginator.get_page(back.previous_cursor)
+        self.assertEqual(list(first), list(pages[0]))
+        self.assertFalse(first.has_previous())
+
+    def test_deep_page_does_not_count(self):
+        """Страница по курсору не выполняет COUNT(*) и OFFSET."""
+        _, pages = self.walk(5)
+        url = reverse('posts:index') + f'?cursor={pages[3].next_cursor}'
+        with self.assertNumQueries(1) as queries:
+            paginator = CursorPaginator(Post.objects.all(), 5)
+            list(paginator.get_page(pages[3].next_cursor))
+        sql = queries.captured_queries[0]['sql']
+        self.assertNotIn('COUNT', sql)
+        self.assertNotIn('OFFSET', sql)
+        response = self.guest_client.get(url)
+        self.assertEqual(list(response.context['page_obj']), list(pages[4]))
+
+    def test_cursor_page_has_no_number(self):
+        page = CursorPaginator(Post.objects.all(), 5).get_page(None)
+        for method in (page.next_page_number, page.previous_page_number,
+                       page.start_index, page.end_index):
+            with self.assertRaisesRegex(TypeError, 'next_cursor'):
+                method()
+
+    def test_broken_cursor_returns_first_page(self):
+        response = self.guest_client.get(
+            reverse('posts:index') + '?cursor=не-курсор'
+        )
+        page_obj = response.context['page_obj']
+        self.assertFalse(page_obj.has_previous())
+        self.assertEqual(len(page_obj), 10)
+
+
+class PageWindowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='window')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Текст{i}') for i in range(95)
+        )
+        sync_after_bulk()
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def get_nav(self, query):
+        response = self.guest_client.get(reverse('posts:index') + query)
+        return response.content.decode()
+
+    def test_window_is_bounded(self):
+        """Навигация показывает окно вокруг текущей страницы."""
+        nav = self.get_nav('?page=5')
+        for number in (1, 3, 4, 6, 7, 10):
+            self.assertIn(f'href="?page={number}"', nav)
+        for number in (2, 8, 9):
+            self.assertNotIn(f'href="?page={number}"', nav)
+        self.assertEqual(nav.count('&hellip;'), 2)
+
+    def test_estimated_count_hides_last_page(self):
+        """Выше порога подсчёт ограничен, последняя страница скрыта."""
+        paginator = EstimatedPaginator(Post.objects.all(), 10, count_limit=30)
+        page = paginator.get_page(1)
+        self.assertTrue(paginator.is_estimated)
+        self.assertTrue(page.has_next())
+        self.assertLess(paginator.count, Post.objects.count())
+        deep = EstimatedPaginator(Post.objects.all(), 10, count_limit=30)
+        with CaptureQueriesContext(connection) as queries:
+            page = deep.get_page(1000000)
+        # Далёкая страница не поднимает порог подсчёта.
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 10)
+        self.assertTrue(any('LIMIT 31' in query['sql'] for query in queries))
+
+    def test_page_url_keeps_other_params(self):
+        nav = self.get_nav('?page=2&q=test')
+        self.assertIn('href="?q=test&amp;page=3"', nav)
@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class RenderedHtmlTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='renderer')
+        self.group = Group.objects.create(
+            title='Группа', slug='rendered', description='Раз\n\nдва <b>'
+        )
+        self.post = Post.objects.create(
+            author=self.user, group=self.group, text='Строка\nи <script>'
+        )
+        self.guest_client = Client()
+
+    def test_html_is_rendered_on_save(self):
+        self.assertEqual(
+            self.post.text_html, '<p>Строка<br>и &lt;script&gt;</p>'
+        )
+        self.assertEqual(
+            self.group.description_html, '<p>Раз</p>\n\n<p>два &lt;b&gt;</p>'
+        )
+        self.post.text = 'Новый текст'
+        self.post.save(update_fields=['text'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, '<p>Новый текст</p>')
+
+    def test_pages_emit_stored_html(self):
+        Post.objects.filter(pk=self.post.pk).update(text_html='<p>готово</p>')
+        Group.objects.filter(pk=self.group.pk).update(
+            description_html='<p>описание</p>'
+        )
+        detail = self.guest_client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertContains(detail, '<p>готово</p>')
+        group = self.guest_client.get(
+            reverse('posts:group_list', args=[self.group.slug])
+        )
+        self.assertContains(group, '<p>описание</p>')
+
+    def test_backfill_command(self):
+        """Команда заполняет HTML строк, записанных без него."""
+        Post.objects.update(text_html='')
+        Group.objects.update(description_html='')
+        call_command('render_html', '--batch-size', '1', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(
+            self.post.text_html, '<p>Строка<br>и &lt;script&gt;</p>'
+        )
+        self.assertEqual(
+            self.group.description_html, '<p>Раз</p>\n\n<p>два &lt;b&gt;</p>'
+        )
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+from ..models import Post
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_superuser(
+            username='search', email='search@example.com', password='pass'
+        )
+        cls.rare = Post.objects.create(
+            author=cls.user, text='Лошадь скакала по полю'
+        )
+        cls.frequent = Post.objects.create(
+            author=cls.user, text='Лошадь, лошадь и ещё раз лошадь'
+        )
+        Post.objects.create(author=cls.user, text='Кот спал на диване')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query):
+        response = self.guest_client.get(reverse('posts:search'), {'q': query})
+        return list(response.context['page_obj'])
+
+    def test_search_is_ranked(self):
+        """Результаты упорядочены по релевантности."""
+        self.assertEqual(self.search('лошадь'), [self.frequent, self.rare])
+
+    def test_search_by_prefix_and_all_words(self):
+        self.assertEqual(self.search('лош поле'), [])
+        self.assertEqual(self.search('лош пол'), [self.rare])
+
+    def test_index_follows_edit_and_delete(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        rare = Post.objects.get(pk=self.rare.pk)
+        rare.text = 'Собака бежала по полю'
+        rare.save()
+        self.assertEqual(self.search('собака'), [rare])
+        self.assertEqual(self.search('лошадь'), [self.frequent])
+        Post.objects.filter(pk=self.frequent.pk).delete()
+        self.assertEqual(self.search('лошадь'), [])
+
+    def test_operators_in_query_are_safe(self):
+        for query in ('"', 'NOT', 'кот OR', '*', 'text:кот'):
+            with self.subTest(query=query):
+                response = self.guest_client.get(
+                    reverse('posts:search'), {'q': query}
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_admin_uses_index(self):
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'диван'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
@@ -0,0 +1,61 @@
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db.models import Count, Max, Min
+from django.test import TestCase
+
+from ..counters import find_counter_mismatches
+from ..export import parse_moment
+from ..models import Group, Post, User
+
+
+class SeedTests(TestCase):
+    def seed(self, **options):
+        call_command(
+            'seed', users=20, groups=5, posts=300, batch_size=100,
+            stdout=io.StringIO(), **options
+        )
+
+    def test_creates_requested_volumes(self):
+        """Создаётся заданное количество строк, счётчики верны."""
+        self.seed()
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(find_counter_mismatches(), [])
+
+    def test_is_deterministic(self):
+        """Одно и то же зерно даёт одни и те же данные."""
+        self.seed(seed=7)
+        first = list(Post.objects.order_by('pk').values_list(
+            'text', 'author__username', 'group__slug', 'pub_date'
+        ))
+        Post.objects.all().delete()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        self.seed(seed=7)
+        second = list(Post.objects.order_by('pk').values_list(
+            'text', 'author__username', 'group__slug', 'pub_date'
+        ))
+        self.assertEqual(first, second)
+
+    def test_dates_end_at_now(self):
+        """Даты постов лежат в --days дней до --now."""
+        self.seed(now='2020-06-01', days=10)
+        dates = Post.objects.aggregate(first=Min('pub_date'),
+                                       last=Max('pub_date'))
+        now = parse_moment('2020-06-01')
+        self.assertLessEqual(dates['last'], now)
+        self.assertGreaterEqual(dates['first'], now - timedelta(days=10))
+
+    def test_authors_are_skewed(self):
+        """Самый активный автор пишет заметно больше медианного."""
+        self.seed(skew=1.5)
+        counts = sorted(
+            Post.objects.order_by().values('author').annotate(
+                total=Count('pk')
+            ).values_list('total', flat=True),
+            reverse=True
+        )
+        self.assertGreater(counts[0], 5 * counts[len(counts) // 2])
@@ -1,8 +1,12 @@
 from django.test import TestCase, Client
+from ..bulk import sync_after_bulk
 from ..models import Post, Group
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django import forms
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 
 User = get_user_model()
@@ -27,6 +31,7 @@ class PostViewTests(TestCase):
                                     group=cls.group)
     
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -118,4 +123,42 @@ class PaginatorViewsTest(TestCase):
     def test_second_page_contains_three_records(self):
         response = self.client.get(reverse('posts:index') + '?page=2')
 
-        self.assertEqual(len(response.context.get('page_obj').object_list), POST_IN_SECOND_PAGE)
\ No newline at end of file
+        self.assertEqual(len(response.context.get('page_obj').object_list), POST_IN_SECOND_PAGE)
+
+
+class FeedQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='feed', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='feed-slug',
+            description='Тестовое описание группы'
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user.username}),
+        )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return len(queries)
+
+    def test_feed_query_count_does_not_depend_on_page_size(self):
+        """Число запросов ленты не зависит от количества постов."""
+        Post.objects.create(author=self.user, text='Пост', group=self.group)
+        single = {url: self.count_queries(url) for url in self.urls}
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {i}', group=self.group)
+            for i in range(POST_IN_FIRST_PAGE)
+        )
+        sync_after_bulk()
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), single[url])
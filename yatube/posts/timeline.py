@@ -0,0 +1,177 @@
+"""Лента подписок: fan-out при записи и подтягивание при чтении.
+
+Новый пост попадает в очередь FanoutTask, и команда fanout_timelines
+раскладывает его в TimelineEntry подписчиков вне запроса. Посты
+авторов с числом подписчиков больше FANOUT_LIMIT не раскладываются:
+их лента подписчика подтягивает из таблицы постов при чтении, как и
+посты, ещё ждущие в очереди, — поэтому свой новый пост подписчики
+видят сразу. Когда подписчиков снова становится FANOUT_LIMIT, последние
+посты автора заново ставятся в очередь: при чтении они больше не
+подтягиваются, и без этого пропали бы из лент.
+"""
+from django.db import transaction
+
+from .models import AuthorStats, FanoutTask, Follow, Post, TimelineEntry
+from .paginators import CursorPaginator
+
+# авторы с большим числом подписчиков читаются, а не раскладываются
+FANOUT_LIMIT = 1000
+# сколько записей лент вставлять одним bulk_create
+FANOUT_CHUNK = 1000
+# сколько последних постов автора положить в ленту при подписке
+FOLLOW_BACKFILL = 50
+
+
+def is_pulled(followers_count):
+    return followers_count > FANOUT_LIMIT
+
+
+def get_followers_count(author):
+    try:
+        return author.stats.followers_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+def add_entries(user_ids, posts):
+    """Раскладывает посты (pk, author_id, pub_date) по лентам."""
+    entries = [
+        TimelineEntry(
+            user_id=user_id, post_id=pk, author_id=author_id,
+            pub_date=pub_date
+        )
+        for user_id in user_ids
+        for pk, author_id, pub_date in posts
+    ]
+    for start in range(0, len(entries), FANOUT_CHUNK):
+        TimelineEntry.objects.bulk_create(
+            entries[start:start + FANOUT_CHUNK], ignore_conflicts=True
+        )
+
+
+def fan_out(post):
+    """Кладёт пост в ленты всех подписчиков автора."""
+    if is_pulled(get_followers_count(post.author)):
+        return
+    followers = Follow.objects.filter(author_id=post.author_id)
+    row = [(post.pk, post.author_id, post.pub_date)]
+    last = 0
+    while True:
+        chunk = list(followers.filter(pk__gt=last).values_list(
+            'pk', 'user_id'
+        )[:FANOUT_CHUNK])
+        if not chunk:
+            return
+        add_entries([user_id for _, user_id in chunk], row)
+        last = chunk[-1][0]
+
+
+def queue_fanout(post_ids):
+    """Ставит посты в очередь раскладки; уже стоящие пропускаются."""
+    FanoutTask.objects.bulk_create(
+        [FanoutTask(post_id=pk) for pk in post_ids], ignore_conflicts=True
+    )
+
+
+def follower_lost(author_id):
+    """После отписки: вернулся ли автор к раскладке при записи.
+
+    Пока подписчиков больше FANOUT_LIMIT, посты автора в TimelineEntry
+    не попадают. Когда их становится ровно FANOUT_LIMIT, последние
+    FOLLOW_BACKFILL постов заново ставятся в очередь fan-out, как при
+    подписке; до раскладки лента подтягивает их из очереди.
+    """
+    followers = AuthorStats.objects.filter(author_id=author_id).values_list(
+        'followers_count', flat=True
+    ).first() or 0
+    if followers != FANOUT_LIMIT:
+        return
+    queue_fanout(Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-pk'
+    ).values_list('pk', flat=True)[:FOLLOW_BACKFILL])
+
+
+def process_fanout(batch_size=100):
+    """Разбирает пачку очереди; возвращает число разложенных постов."""
+    tasks = list(
+        FanoutTask.objects.select_related('post__author__stats').order_by(
+            'pk'
+        )[:batch_size]
+    )
+    for task in tasks:
+        with transaction.atomic():
+            fan_out(task.post)
+            task.delete()
+    return len(tasks)
+
+
+def follow(user, author):
+    """Подписка с заполнением ленты последними постами автора."""
+    with transaction.atomic():
+        _, created = Follow.objects.get_or_create(user=user, author=author)
+        if created and not is_pulled(get_followers_count(author)):
+            add_entries([user.pk], author.posts.order_by(
+                '-pub_date', '-pk'
+            ).values_list('pk', 'author_id', 'pub_date')[:FOLLOW_BACKFILL])
+    return created
+
+
+def unfollow(user, author):
+    with transaction.atomic():
+        for subscription in Follow.objects.filter(user=user, author=author):
+            # delete() по объекту, чтобы сигналы обновили счётчик
+            subscription.delete()
+        TimelineEntry.objects.filter(user=user, author=author).delete()
+
+
+class TimelinePaginator(CursorPaginator):
+    """Курсорная пагинация ленты подписок.
+
+    Для каждой позиции курсора берётся по странице из нескольких
+    источников: записей TimelineEntry пользователя, постов каждого
+    популярного автора из подписок и постов, ждущих fan-out. Каждая
+    выборка идёт по своему индексу с LIMIT; ключи сливаются, а сами
+    посты загружаются одним запросом.
+    """
+
+    def __init__(self, user, per_page):
+        super().__init__(Post.objects.for_feed(), per_page)
+        self.user = user
+
+    def sources(self):
+        """Пары (выборка, имя поля id поста) — источники ленты."""
+        sources = [(TimelineEntry.objects.filter(user=self.user), 'post_id')]
+        followed = Follow.objects.filter(user=self.user).values_list(
+            'author_id', 'author__stats__followers_count'
+        )
+        for author_id, followers in followed:
+            if is_pulled(followers or 0):
+                sources.append(
+                    (Post.objects.filter(author_id=author_id), 'pk')
+                )
+        sources.append((
+            Post.objects.filter(
+                pk__in=FanoutTask.objects.values('post_id'),
+                author__following__user=self.user,
+            ),
+            'pk'
+        ))
+        return sources
+
+    def fetch(self, position=None, forward=True):
+        limit = self.per_page + 1
+        keys = set()
+        for rows, pk_field in self.sources():
+            if position is not None:
+                rows = rows.filter(
+                    self.keyset(*position, forward, pk_field=pk_field)
+                )
+            order = ('pub_date', pk_field)
+            if forward:
+                order = tuple(f'-{field}' for field in order)
+            keys.update(rows.order_by(*order).values_list(
+                'pub_date', pk_field
+            )[:limit])
+        keys = sorted(keys, reverse=forward)[:limit]
+        found = self.object_list.in_bulk([pk for _, pk in keys])
+        return [found[pk] for _, pk in keys if pk in found]
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'posts'
 
@@ -8,6 +8,38 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_list, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('search/', views.search, name='search'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path(
+        'profile/<str:username>/follow/',
+        views.profile_follow,
+        name='profile_follow'
+    ),
+    path(
+        'profile/<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow'
+    ),
+    path(
+        'profile/<str:username>/follow-button/',
+        views.follow_button,
+        name='follow_button'
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<post_id>/edit/', views.post_edit, name='post_edit'),
+    path('api/posts/', api.post_list, name='api_post_list'),
+    path('api/posts/<int:post_id>/', api.post_detail, name='api_post_detail'),
+    path('api/export/', api.export_posts, name='api_export'),
+    path('api/groups/<slug:slug>/', api.group_detail, name='api_group'),
+    path(
+        'api/groups/<slug:slug>/posts/',
+        api.group_posts,
+        name='api_group_posts'
+    ),
+    path('api/authors/<str:username>/', api.author_detail, name='api_author'),
+    path(
+        'api/authors/<str:username>/posts/',
+        api.author_posts,
+        name='api_author_posts'
+    ),
 ]
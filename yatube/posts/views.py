@@ -1,15 +1,27 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Post, Group, User
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_POST
+from .models import FeedEntry, Follow, Post, Group, User
+from . import conditional, fts, timeline
+from .counters import get_author_posts_count
 from .forms import PostForm
+from .page_cache import (
+    cache_shared_page, group_scopes, index_scopes, post_scopes,
+    profile_scopes
+)
+from .paginators import CursorPaginator, EstimatedPaginator
 
 AMOUNT_POST = 10
 
 
+@conditional.conditional_feed(conditional.index_posts, index_scopes)
+@cache_shared_page(index_scopes)
 def index(request):
     title = "Последние обновления на сайте"
-    posts = Post.objects.all()
+    posts = FeedEntry.objects.as_posts()
     page_obj = get_page_paginator(request, posts)
     context = {
         'title': title,
@@ -19,9 +31,11 @@ def index(request):
     return render(request, 'posts/index.html', context)
 
 
+@conditional.conditional_feed(conditional.group_posts, group_scopes)
+@cache_shared_page(group_scopes)
 def group_list(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = group.posts.for_feed()
     page_obj = get_page_paginator(request, posts)
     context = {'group': group,
                'posts': posts,
@@ -29,22 +43,31 @@ def group_list(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional.conditional_feed(conditional.profile_posts, profile_scopes)
+@cache_shared_page(profile_scopes)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    post_list = author.posts.for_feed()
     page_obj = get_page_paginator(request, post_list)
     context = {
         'author': author,
+        'author_posts': get_author_posts_count(author),
         'page_obj': page_obj,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@conditional.conditional_feed(conditional.post_detail_posts, post_scopes)
+@cache_shared_page(post_scopes)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id
+    )
     post_title = post.text[:30]
     author = post.author
-    author_posts = author.posts.all().count()
+    author_posts = get_author_posts_count(author)
     context = {
         "post": post,
         "post_title": post_title,
@@ -54,6 +77,21 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        posts = fts.search(Post.objects.for_feed(), query)
+        page_obj = Paginator(posts, AMOUNT_POST).get_page(
+            request.GET.get('page')
+        )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None)
@@ -87,7 +125,56 @@ def post_edit(request, post_id):
 
 
 def get_page_paginator(request, posts):
-    pagi = Paginator(posts, AMOUNT_POST)
+    cursor = request.GET.get('cursor')
+    if cursor is not None or settings.POSTS_CURSOR_PAGINATION:
+        return CursorPaginator(posts, AMOUNT_POST).get_page(cursor)
+    pagi = EstimatedPaginator(posts, AMOUNT_POST)
     page_number = request.GET.get('page')
     page_obj = pagi.get_page(page_number)
     return page_obj
+
+
+@login_required
+def follow_index(request):
+    paginator = timeline.TimelinePaginator(request.user, AMOUNT_POST)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    return render(request, 'posts/follow.html', {'page_obj': page_obj})
+
+
+@login_required
+@require_POST
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        timeline.follow(request.user, author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+@require_POST
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    timeline.unfollow(request.user, author)
+    return redirect('posts:profile', username)
+
+
+def follow_button(request, username):
+    """Кнопка подписки для профиля.
+
+    Профиль одинаков для всех и лежит в общем кэше, поэтому кнопка,
+    зависящая от пользователя, подключается через edge include.
+    Гостю и самому автору кнопка не нужна, и база не читается.
+    """
+    user = request.user
+    show = user.is_authenticated and user.username != username
+    following = show and Follow.objects.filter(
+        user=user, author__username=username
+    ).exists()
+    response = render(
+        request,
+        'posts/includes/follow_button.html',
+        {'username': username, 'show': show, 'following': following}
+    )
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
+    return response
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+
+User = get_user_model()
+
+
+class HeaderFragmentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='header')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_header_is_private(self):
+        """Личная часть шапки не кэшируется общими прокси."""
+        response = self.authorized_client.get(
+            reverse('users:header'), {'view': 'posts:post_create'}
+        )
+        self.assertContains(response, 'Пользователь: header')
+        self.assertContains(response, 'active')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        response = Client().get(reverse('users:header'))
+        self.assertContains(response, 'Войти')
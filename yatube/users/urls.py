@@ -1,4 +1,6 @@
-from django.contrib.auth.views import LogoutView, LoginView, PasswordResetView
+from django.contrib.auth.views import (
+    LogoutView, LoginView, PasswordResetDoneView, PasswordResetView
+)
 from django.urls import path
 from . import views
 from django.urls import reverse_lazy
@@ -10,6 +12,7 @@ urlpatterns = [
          LogoutView.as_view(template_name='users/logged_out.html'),
          name='logout'),
     path('signup/', views.SignUp.as_view(), name='signup'),
+    path('header/', views.header, name='header'),
     path(
         'login/',
         LoginView.as_view(template_name='users/login.html'),
@@ -23,4 +26,9 @@ urlpatterns = [
         ),
         name='password_reset_form'
     ),
+    path(
+        'password_reset/done/',
+        PasswordResetDoneView.as_view(),
+        name='password_reset_done'
+    ),
 ]
@@ -1,3 +1,5 @@
+from django.shortcuts import render
+from django.utils.cache import patch_cache_control, patch_vary_headers
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
 from .forms import CreationForm
@@ -8,3 +10,19 @@ class SignUp(CreateView):
     # После успешной регистрации перенаправляем пользователя на главную.
     success_url = reverse_lazy('posts:index')
     template_name = 'users/signup.html'
+
+
+def header(request):
+    """Пункты шапки, зависящие от пользователя.
+
+    Страницы подключают их через edge include, поэтому сами страницы
+    одинаковы для всех и кэшируются; этот ответ — личный.
+    """
+    response = render(
+        request,
+        'includes/header_user.html',
+        {'view_name': request.GET.get('view', '')}
+    )
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Cookie',))
+    return response
@@ -32,6 +32,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,6 +41,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.EdgeIncludeMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -47,7 +50,7 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -119,7 +122,84 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
-#  подключаем движок filebased.EmailBackend
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# письма ставятся в очередь, отправляет их команда send_queued_mail
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+#  подключаем движок filebased.EmailBackend для отправки из очереди
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# пагинация лент по курсору (pub_date, id) вместо номеров страниц
+POSTS_CURSOR_PAGINATION = False
+
+# подставлять edge include в самом Django (замена прокси с SSI);
+# если include обрабатывает nginx, поставьте False
+EDGE_INCLUDES = True
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# Кэш страниц и карточек сбрасывается сменой меток версий в кэше.
+# LocMemCache у каждого процесса свой: смену метки видит только
+# процесс, где она произошла, а остальные отдают старое до конца срока
+# хранения. Поэтому сроки здесь короткие. Сутки допустимы только
+# с общим для всех процессов кэшем (memcached, redis).
+PAGE_CACHE_TIMEOUT = 60
+FRAGMENT_CACHE_TIMEOUT = 60
+
+# сессии хранятся в базе, истёкшие удаляются пачками; кэш перед
+# ними нужен общий для процессов (memcached, redis), а не LocMemCache,
+# иначе выход виден только одному процессу
+SESSION_ENGINE = 'core.sessions'
+
+# выгрузку /api/export/ получают персонал и запросы с заголовком
+# Authorization: Bearer <токен>; не больше EXPORT_RATE_LIMIT выгрузок
+# за EXPORT_RATE_PERIOD секунд на пользователя или адрес
+EXPORT_TOKEN = os.environ.get('EXPORT_TOKEN')
+EXPORT_RATE_LIMIT = 10
+EXPORT_RATE_PERIOD = 60 * 60
+
+# метрики запросов для Prometheus на /metrics
+METRICS_ENABLED = True
+# кроме персонала /metrics получает сборщик с заголовком
+# Authorization: Bearer <токен>; остальным — 404
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# отдавать замеры запроса в заголовке Server-Timing
+METRICS_SERVER_TIMING = DEBUG
+
+# SQL-запросы дольше стольких миллисекунд попадают в журнал
+# медленных запросов; None — не следить
+SLOW_QUERY_MS = 100
+# писать ли в журнал значения параметров SELECT; без этого, как и для
+# всех остальных запросов, пишутся только их типы
+SLOW_QUERY_PARAMS = False
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'slow_queries.log')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}